@@ -0,0 +1,191 @@
+from square import Square, SQUARES
+from piece import Piece, KING_STEPS, QUEEN_DIRECTIONS, KING, QUEEN, TYPE_NAMES
+from board import Board, Undo
+from typing import Dict, Iterator, List
+
+# Squares are numbered 0-63 as row * 8 + col, so bit 0 is a8 and bit 63 is h1
+OTHER_COLOR = {"white": "black", "black": "white"}
+
+
+def square_index(square: Square) -> int:
+    """Return the 0-63 bit index of a square."""
+    return square.index
+
+
+def index_square(index: int) -> Square:
+    """Return the Square for a 0-63 bit index."""
+    return SQUARES[index]
+
+
+def bits(bb: int) -> Iterator[int]:
+    """Yield the index of every set bit, lowest first."""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def _step_mask(index: int, steps) -> int:
+    row, col = divmod(index, 8)
+    mask = 0
+    for dr, dc in steps:
+        r, c = row + dr, col + dc
+        if 0 <= r < 8 and 0 <= c < 8:
+            mask |= 1 << (r * 8 + c)
+    return mask
+
+
+def _ray_mask(index: int, dr: int, dc: int) -> int:
+    row, col = divmod(index, 8)
+    mask = 0
+    r, c = row + dr, col + dc
+    while 0 <= r < 8 and 0 <= c < 8:
+        mask |= 1 << (r * 8 + c)
+        r += dr
+        c += dc
+    return mask
+
+
+KING_ATTACKS: List[int] = [_step_mask(i, KING_STEPS) for i in range(64)]
+# RAYS[d][i] holds every square from i outwards in direction d, not including i itself.
+# Rays running towards higher indices meet their nearest blocker at the lowest set bit.
+RAYS: List[List[int]] = [[_ray_mask(i, dr, dc) for i in range(64)] for dr, dc in QUEEN_DIRECTIONS]
+RAY_ASCENDING: List[bool] = [dr * 8 + dc > 0 for dr, dc in QUEEN_DIRECTIONS]
+
+
+def queen_attacks(index: int, occupied: int) -> int:
+    """Return the squares a queen on index attacks, stopping each ray at its first blocker."""
+    attacks = 0
+    for rays, ascending in zip(RAYS, RAY_ASCENDING):
+        ray = rays[index]
+        blockers = ray & occupied
+        if blockers:
+            blocker = (blockers & -blockers).bit_length() - 1 if ascending else blockers.bit_length() - 1
+            ray ^= rays[blocker]
+        attacks |= ray
+    return attacks
+
+
+class BitBoard(Board):
+    """Board backed by one 64-bit integer per colour and piece type.
+
+    Keeps the Board API (and its pieces dict) so existing code works unchanged,
+    but check detection and move generation run on integer masks."""
+
+    def __init__(self):
+        super().__init__()
+        self.kings: Dict[str, int] = {"white": 0, "black": 0}
+        self.queens: Dict[str, int] = {"white": 0, "black": 0}
+        self.occupied: Dict[str, int] = {"white": 0, "black": 0}
+
+    def _masks(self, kind: int) -> Dict[str, int]:
+        if kind == KING:
+            return self.kings
+        elif kind == QUEEN:
+            return self.queens
+        raise ValueError(f"Unsupported piece type {TYPE_NAMES[kind]}")
+
+    def _toggle(self, piece: Piece, index: int) -> None:
+        bit = 1 << index
+        self._masks(piece.kind)[piece.clr] ^= bit
+        self.occupied[piece.clr] ^= bit
+
+    def add_piece(self, piece: Piece) -> None:
+        """Add a piece to the board at its position."""
+        existing = self.pieces.get(piece.pos)
+        if existing is not None:
+            self._toggle(existing, existing.pos.index)
+        self._toggle(piece, piece.pos.index)
+        super().add_piece(piece)
+
+    def move_piece(self, curr_pos: Square, new_pos: Square) -> None:
+        """Move a piece from curr_pos to new_pos, updating its position."""
+        self.make_move(curr_pos, new_pos)
+
+    def make_move(self, curr_pos: Square, new_pos: Square) -> Undo:
+        """Play a move, capturing whatever stands on new_pos, and return the record unmake_move needs."""
+        undo = super().make_move(curr_pos, new_pos)
+        captured = undo[2]
+        to_index = square_index(new_pos)
+        if captured is not None:
+            self._toggle(captured, to_index)
+        piece = self.pieces[new_pos]
+        self._toggle(piece, square_index(curr_pos))
+        self._toggle(piece, to_index)
+        return undo
+
+    def unmake_move(self, undo: Undo) -> None:
+        """Take back a move played by make_move, restoring any captured piece."""
+        curr_pos, new_pos, captured = undo
+        piece = self.pieces[new_pos]
+        to_index = square_index(new_pos)
+        self._toggle(piece, to_index)
+        self._toggle(piece, square_index(curr_pos))
+        if captured is not None:
+            self._toggle(captured, to_index)
+        super().unmake_move(undo)
+
+    def get_king(self, color: str) -> Piece:
+        """Return the king of the specified color."""
+        king = self.kings[color]
+        if not king:
+            raise ValueError(f"No {color} king found on the board")
+        return self.pieces[index_square(king.bit_length() - 1)]
+
+    def _is_attacked(self, index: int, by: str, occupied: int, queens: int) -> bool:
+        """Check if the square at index is attacked by colour `by`, given its queen mask and total occupancy."""
+        return bool(KING_ATTACKS[index] & self.kings[by]) or \
+            bool(queens and queen_attacks(index, occupied) & queens)
+
+    def is_in_check(self, clr: str) -> bool:
+        """Check if the king of the given color is in check."""
+        king = self.kings[clr]
+        if not king:
+            raise ValueError(f"No {clr} king found on the board")
+        enemy = OTHER_COLOR[clr]
+        occupied = self.occupied["white"] | self.occupied["black"]
+        return self._is_attacked(king.bit_length() - 1, enemy, occupied, self.queens[enemy])
+
+    def _is_square_attacked_by_queen(self, target: Square, q_pos: Square) -> bool:
+        """Check if the target square is attacked by the queen at q_pos."""
+        occupied = self.occupied["white"] | self.occupied["black"]
+        return bool(queen_attacks(square_index(q_pos), occupied) >> square_index(target) & 1)
+
+    def _legal_targets(self, clr: str, index: int, piece_type: str) -> int:
+        """Return the mask of legal destinations for the piece of colour clr on index."""
+        own = self.occupied[clr]
+        enemy = OTHER_COLOR[clr]
+        occupied = own | self.occupied[enemy]
+        if piece_type == "king":
+            targets = KING_ATTACKS[index] & ~own
+        else:
+            targets = queen_attacks(index, occupied) & ~own
+        king = self.kings[clr].bit_length() - 1
+        legal = 0
+        from_bit = 1 << index
+        for target in bits(targets):
+            to_bit = 1 << target
+            # Evaluate the position after the move on masks alone; a capture removes the enemy queen
+            after = (occupied ^ from_bit) | to_bit
+            queens = self.queens[enemy] & ~to_bit
+            if not self._is_attacked(target if piece_type == "king" else king, enemy, after, queens):
+                legal |= to_bit
+        return legal
+
+    def has_legal_move(self, clr: str) -> bool:
+        """Check if the given color has at least one move that doesn't leave its king in check."""
+        for masks, piece_type in ((self.kings, "king"), (self.queens, "queen")):
+            for index in bits(masks[clr]):
+                if self._legal_targets(clr, index, piece_type):
+                    return True
+        return False
+
+    def get_legal_moves(self, clr: str) -> List[tuple[Square, Square]]:
+        """Get all legal moves for the given color."""
+        moves = []
+        for masks, piece_type in ((self.kings, "king"), (self.queens, "queen")):
+            for index in bits(masks[clr]):
+                from_square = index_square(index)
+                moves.extend((from_square, index_square(target))
+                             for target in bits(self._legal_targets(clr, index, piece_type)))
+        return moves
@@ -1,6 +1,9 @@
-from square import Square
-from piece import Piece
-from typing import Dict, List
+from square import Square, SQUARES
+from piece import Piece, KING, QUEEN, COLOR_CODES
+from typing import Dict, List, Tuple
+
+# (from square, to square, captured piece or None), as returned by make_move
+Undo = Tuple[Square, Square, Piece | None]
 
 class Board:
     def __init__(self):
@@ -20,14 +23,34 @@ class Board:
         piece.pos = new_pos
         self.pieces[new_pos] = piece
 
+    def make_move(self, curr_pos: Square, new_pos: Square) -> Undo:
+        """Play a move, capturing whatever stands on new_pos, and return the record unmake_move needs."""
+        piece = self.pieces.pop(curr_pos, None)
+        if piece is None:
+            raise ValueError(f"No piece at {curr_pos}")
+        captured = self.pieces.get(new_pos)
+        piece.pos = new_pos
+        self.pieces[new_pos] = piece
+        return (curr_pos, new_pos, captured)
+
+    def unmake_move(self, undo: Undo) -> None:
+        """Take back a move played by make_move, restoring any captured piece."""
+        curr_pos, new_pos, captured = undo
+        piece = self.pieces.pop(new_pos)
+        piece.pos = curr_pos
+        self.pieces[curr_pos] = piece
+        if captured is not None:
+            self.pieces[new_pos] = captured
+
     def get_piece(self, square: Square) -> Piece | None:
         """Return the piece at a given square, or None if empty."""
         return self.pieces.get(square)
 
     def get_king(self, color: str) -> Piece:
         """Return the king of the specified color."""
+        code = COLOR_CODES[color]
         for piece in self.pieces.values():
-            if piece.type == "king" and piece.clr == color:
+            if piece.kind == KING and piece.color == code:
                 return piece
         raise ValueError(f"No {color} king found on the board")
 
@@ -36,10 +59,10 @@ class Board:
         king = self.get_king(clr)
         king_pos = king.pos
         for piece in self.pieces.values():
-            if piece.clr != clr:  # Opponent's pieces
-                if piece.type == "king" and piece.pos.is_adjacent_to(king_pos):
+            if piece.color != king.color:  # Opponent's pieces
+                if piece.kind == KING and piece.pos.is_adjacent_to(king_pos):
                     return True
-                elif piece.type == "queen":
+                elif piece.kind == QUEEN:
                     # Check if queen attacks king without being blocked
                     if self._is_square_attacked_by_queen(king_pos, piece.pos):
                         return True
@@ -53,57 +76,52 @@ class Board:
         # Determine direction
         if target.row == q_pos.row:
             step = 1 if target.col > q_pos.col else -1
-            for c in range(q_pos.col + step, target.col, step):
-                if Square(q_pos.row, c) in self.pieces:
+            for index in range(q_pos.index + step, target.index, step):
+                if SQUARES[index] in self.pieces:
                     return False
             return True
         elif target.col == q_pos.col:
             step = 1 if target.row > q_pos.row else -1
-            for r in range(q_pos.row + step, target.row, step):
-                if Square(r, q_pos.col) in self.pieces:
+            for index in range(q_pos.index + step * 8, target.index, step * 8):
+                if SQUARES[index] in self.pieces:
                     return False
             return True
         else:  # Diagonal
-            dr = 1 if target.row > q_pos.row else -1
-            dc = 1 if target.col > q_pos.col else -1
-            r, c = q_pos.row + dr, q_pos.col + dc
-            while (r, c) != (target.row, target.col):
-                if Square(r, c) in self.pieces:
+            step = (8 if target.row > q_pos.row else -8) + (1 if target.col > q_pos.col else -1)
+            for index in range(q_pos.index + step, target.index, step):
+                if SQUARES[index] in self.pieces:
                     return False
-                r += dr
-                c += dc
             return True
 
     def is_checkmate(self, clr: str) -> bool:
         """Check if the given color is in checkmate."""
-        if not self.is_in_check(clr):
-            return False
-        king = self.get_king(clr)
-        # Try all possible moves for this color
-        for piece in self.pieces.values():
-            if piece.clr == clr:
-                moves = piece.get_moves(self)
-                curr_pos = piece.pos
-                for new_pos in moves:
-                    # Simulate the move
-                    self.move_piece(curr_pos, new_pos)
-                    if not self.is_in_check(clr):
-                        # Undo the move
-                        self.move_piece(new_pos, curr_pos)
-                        return False
-                    self.move_piece(new_pos, curr_pos)
-        return True
+        return self.is_in_check(clr) and not self.has_legal_move(clr)
+
+    def is_stalemate(self, clr: str) -> bool:
+        """Check if the given color is not in check but has no legal move."""
+        return not self.is_in_check(clr) and not self.has_legal_move(clr)
+
+    def has_legal_move(self, clr: str) -> bool:
+        """Check if the given color has at least one move that doesn't leave its king in check."""
+        code = COLOR_CODES[clr]
+        for piece in [p for p in self.pieces.values() if p.color == code]:
+            for new_pos in piece.get_moves(self):
+                undo = self.make_move(piece.pos, new_pos)
+                legal = not self.is_in_check(clr)
+                self.unmake_move(undo)
+                if legal:
+                    return True
+        return False
 
     def get_legal_moves(self, clr: str) -> List[tuple[Square, Square]]:
         """Get all legal moves for the given color."""
         moves = []
-        original_pieces = self.pieces.copy()
-        for piece in original_pieces.values():
-            if piece.clr == clr:
-                curr_pos = piece.pos
-                for new_pos in piece.get_moves(self):
-                    self.move_piece(curr_pos, new_pos)
-                    if not self.is_in_check(clr):
-                        moves.append((curr_pos, new_pos))
-                    self.pieces = original_pieces.copy()  # Reset board
-        return moves
\ No newline at end of file
+        code = COLOR_CODES[clr]
+        for piece in [p for p in self.pieces.values() if p.color == code]:
+            curr_pos = piece.pos
+            for new_pos in piece.get_moves(self):
+                undo = self.make_move(curr_pos, new_pos)
+                if not self.is_in_check(clr):
+                    moves.append((curr_pos, new_pos))
+                self.unmake_move(undo)
+        return moves
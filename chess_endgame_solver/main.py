@@ -2,4 +2,247 @@
 This program returns the optimal (quickest) path to a Queen + King vs King
 checkmate, given the position of all 3 pieces. It provides the number of moves
 of the path and the sequence of moves.
-'''
\ No newline at end of file
+
+Positions are read one per line from a file or stdin, either as three squares
+(white king, black king, white queen) with an optional side to move, e.g.
+"e1,e8,d1,w", or as a FEN-like string, e.g. "4k3/8/8/8/8/8/8/3QK3 b". Each
+result is written as a CSV row "position,moves to mate,line" as soon as its
+chunk is done; moves to mate is "draw", "illegal" or "error" where there is no
+mate, and the position field is quoted since it holds commas.
+With --profile, per-solve timings and table probe counts are written as JSON
+(or cProfile-style stats for a .prof path).
+'''
+from square import Square, SQUARES
+from bitboard import square_index
+from tablebase import Tablebase, is_legal
+from tablefile import DEFAULT_PATH, MappedTablebase, load_table
+from profiling import Profiler, write_profile
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import csv
+import math
+import sys
+import time
+
+# (white king, black king, white queen) square indices and whether white is to move
+Position = Tuple[int, int, int, bool]
+# Output fields: position as given, moves to mate (or draw / illegal / error), line or error text
+Row = List[str]
+
+IN_FLIGHT_PER_WORKER = 4  # Chunks queued per worker process
+
+_tablebase: Optional[MappedTablebase] = None
+_profile = False
+
+
+def parse_fen(text: str) -> Position:
+    """Parse the placement and side-to-move fields of a FEN string holding K, Q and k."""
+    fields = text.split()
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError(f"Expected 8 ranks in {fields[0]!r}")
+    found = {}
+    for row, rank in enumerate(ranks):
+        col = 0
+        for char in rank:
+            if char.isdigit():
+                col += int(char)
+            elif char in 'KQk' and char not in found and col < 8:
+                found[char] = row * 8 + col
+                col += 1
+            else:
+                raise ValueError(f"Unexpected {char!r} in {fields[0]!r}")
+        if col != 8:
+            raise ValueError(f"Rank {rank!r} does not have 8 files")
+    if len(found) != 3:
+        raise ValueError("Position must have exactly a white king, white queen and black king")
+    return found['K'], found['k'], found['Q'], _parse_side(fields[1] if len(fields) > 1 else 'w')
+
+
+def _parse_side(field: str) -> bool:
+    """Return whether white is to move for a side-to-move field of 'w' or 'b'."""
+    side = field.lower()
+    if side not in ('w', 'b'):
+        raise ValueError(f"Expected side to move 'w' or 'b', got {field!r}")
+    return side == 'w'
+
+
+def parse_position(text: str) -> Position:
+    """Parse a position given as FEN or as comma-separated squares 'wk,bk,wq[,w|b]'."""
+    if '/' in text:
+        return parse_fen(text)
+    fields = [field.strip() for field in text.split(',')]
+    if len(fields) not in (3, 4):
+        raise ValueError(f"Expected 'wk,bk,wq[,w|b]', got {text!r}")
+    wk, bk, wq = (square_index(Square.from_name(field)) for field in fields[:3])
+    return wk, bk, wq, _parse_side(fields[3] if len(fields) == 4 else 'w')
+
+
+def _init_worker(path: str, profile: bool = False) -> None:
+    global _tablebase, _profile
+    _tablebase = MappedTablebase(path)
+    _profile = profile
+
+
+def solve_line(text: str, tablebase: Optional[Tablebase] = None) -> Tuple[Row, float]:
+    """Solve one input line and return (output row, seconds taken).
+
+    Uses the given tablebase, else the worker's, else the default table file."""
+    global _tablebase
+    if tablebase is None:
+        if _tablebase is None:
+            _tablebase = load_table()
+        tablebase = _tablebase
+    start = time.perf_counter()
+    try:
+        wk, bk, wq, white_to_move = parse_position(text)
+    except ValueError as e:
+        return [text, 'error', str(e)], time.perf_counter() - start
+    if not is_legal(wk, bk, wq, white_to_move):
+        return [text, 'illegal', ''], time.perf_counter() - start
+    dtm = tablebase.dtm(wk, bk, wq, white_to_move)
+    if dtm is None:
+        return [text, 'draw', ''], time.perf_counter() - start
+    line = tablebase.best_line(wk, bk, wq, white_to_move)
+    moves = ' '.join(SQUARES[a].name + SQUARES[b].name for a, b in line)
+    return [text, str(dtm), moves], time.perf_counter() - start
+
+
+def solve_chunk(lines: List[str]) -> Tuple[List[Tuple[Row, float]], Optional[Dict[str, Any]]]:
+    """Solve a chunk of lines, returning the rows and, when profiling, this chunk's profile data."""
+    if not _profile:
+        return [solve_line(text) for text in lines], None
+    profiler = Profiler()
+    with profiler:
+        results = [solve_line(text) for text in lines]
+    return results, profiler.to_dict()
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for text in lines:
+        text = text.strip()
+        if not text or text.startswith('#'):
+            continue
+        chunk.append(text.replace('"', ''))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_positions(lines: Iterable[str], path: str = DEFAULT_PATH, workers: Optional[int] = None,
+                    chunk_size: int = 1000, profiler: Optional[Profiler] = None) -> Iterator[Tuple[Row, float]]:
+    """Solve a stream of positions across a process pool, yielding (output row, seconds) in input order.
+
+    Every worker maps the same on-disk table, which is built first if missing. Given
+    a profiler, every worker profiles its chunks and the results are merged into it."""
+    load_table(path)
+    yield from _solve_in_pool(lines, path, workers, chunk_size, profiler)
+
+
+def _solve_in_pool(lines: Iterable[str], path: str, workers: Optional[int], chunk_size: int,
+                   profiler: Optional[Profiler]) -> Iterator[Tuple[Row, float]]:
+    # Only a fixed number of chunks are read ahead, so memory stays flat however long the stream is
+    workers = workers or cpu_count()
+    with Pool(workers, initializer=_init_worker, initargs=(path, profiler is not None)) as pool:
+        pending: Deque[Any] = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(pool.apply_async(solve_chunk, (chunk,)))
+            if len(pending) >= IN_FLIGHT_PER_WORKER * workers:
+                yield from _collect(pending.popleft().get(), profiler)
+        while pending:
+            yield from _collect(pending.popleft().get(), profiler)
+
+
+def _collect(chunk_result: Tuple[List[Tuple[Row, float]], Optional[Dict[str, Any]]],
+             profiler: Optional[Profiler]) -> List[Tuple[Row, float]]:
+    results, profile = chunk_result
+    if profile is not None:
+        profiler.merge(profile)
+    return results
+
+
+class LatencyHistogram:
+    """Mean and percentiles of latencies in constant memory, from log-spaced buckets of 1/BUCKETS_PER_DECADE decade."""
+
+    BUCKETS_PER_DECADE = 20
+    LOWEST = 1e-7  # Seconds; anything faster lands in the first bucket
+    SIZE = 9 * BUCKETS_PER_DECADE  # Up to 100s
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one latency."""
+        bucket = int(math.log10(max(seconds, self.LOWEST) / self.LOWEST) * self.BUCKETS_PER_DECADE)
+        self.counts[min(bucket, self.SIZE - 1)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def mean(self) -> float:
+        """Return the mean latency in seconds."""
+        return self.total / self.count
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper edge of the bucket holding the given fraction of latencies, within 12%."""
+        rank = max(1, math.ceil(self.count * fraction))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        return self.LOWEST * 10 ** ((bucket + 1) / self.BUCKETS_PER_DECADE)
+
+
+def run(source: TextIO, output: TextIO, path: str, workers: Optional[int], chunk_size: int,
+        profile_path: Optional[str] = None) -> None:
+    """Solve every position in source, write rows to output and report throughput on stderr."""
+    load_table(path)  # Build the table up front so it doesn't count against throughput
+    profiler = Profiler() if profile_path else None
+    writer = csv.writer(output, lineterminator='\n')
+    start = time.perf_counter()
+    latencies = LatencyHistogram()
+    for row, latency in _solve_in_pool(source, path, workers, chunk_size, profiler):
+        writer.writerow(row)
+        latencies.add(latency)
+    elapsed = time.perf_counter() - start
+    if latencies.count:
+        print(f"Solved {latencies.count} positions in {elapsed:.2f}s "
+              f"({latencies.count / elapsed:.0f} positions/s); latency mean "
+              f"{latencies.mean() * 1e6:.0f}us, p99 "
+              f"{latencies.percentile(0.99) * 1e6:.0f}us", file=sys.stderr)
+    if profiler is not None:
+        write_profile(profiler, profile_path)
+        print(f"Wrote profile to {profile_path}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quickest King + Queen vs King mates")
+    parser.add_argument('input', nargs='?', default='-', help="file of positions, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="file for results, or - for stdout")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="positions per job sent to a worker")
+    parser.add_argument('--table', default=DEFAULT_PATH, help="tablebase file, built if missing")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="record per-solve counters and timings to PATH (JSON, or pstats data if it ends in .prof)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run(source, output, args.table, args.workers, args.chunk_size, args.profile)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
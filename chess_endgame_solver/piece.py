@@ -1,11 +1,70 @@
-from square import Square
-from board import Board
+from square import Square, SQUARES
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from board import Board
+
+KING_STEPS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+QUEEN_DIRECTIONS = KING_STEPS
+
+# Integer codes stored on each Piece; the type and clr strings are derived from them
+KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN = range(6)
+WHITE, BLACK = 0, 1
+TYPE_NAMES = ("king", "queen", "rook", "bishop", "knight", "pawn")
+COLOR_NAMES = ("white", "black")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+COLOR_CODES = {name: code for code, name in enumerate(COLOR_NAMES)}
+
+# STEP_TARGETS[i] lists the squares one king step away from square index i
+STEP_TARGETS: List[List[Square]] = [
+    [SQUARES[(i >> 3) + dr << 3 | (i & 7) + dc] for dr, dc in KING_STEPS
+     if 0 <= (i >> 3) + dr < 8 and 0 <= (i & 7) + dc < 8]
+    for i in range(64)
+]
+
 
 class Piece:
+    __slots__ = ('kind', 'color', 'pos')
+
     def __init__(self, type: str, pos: Square, clr: str) -> None:
-        self.type = type
+        self.kind = TYPE_CODES[type]
         self.pos = pos
-        self.clr = clr
-    
-    def get_moves(self, board: Board):
-        pass
+        self.color = COLOR_CODES[clr]
+
+    @property
+    def type(self) -> str:
+        """Return the piece type name (e.g., 'king')."""
+        return TYPE_NAMES[self.kind]
+
+    @property
+    def clr(self) -> str:
+        """Return the piece colour name ('white' or 'black')."""
+        return COLOR_NAMES[self.color]
+
+    def __repr__(self) -> str:
+        """Return the constructor call for the piece."""
+        return f"Piece({self.type!r}, {self.pos!r}, {self.clr!r})"
+
+    def get_moves(self, board: 'Board') -> List[Square]:
+        """Return the squares this piece can move to, ignoring whether its own king is left in check."""
+        moves = []
+        pieces = board.pieces
+        if self.kind == KING:
+            for target in STEP_TARGETS[self.pos.index]:
+                occupant = pieces.get(target)
+                if occupant is None or occupant.color != self.color:
+                    moves.append(target)
+        elif self.kind == QUEEN:
+            for dr, dc in QUEEN_DIRECTIONS:
+                r, c = self.pos.row + dr, self.pos.col + dc
+                while 0 <= r < 8 and 0 <= c < 8:
+                    target = SQUARES[r << 3 | c]
+                    occupant = pieces.get(target)
+                    if occupant is not None:
+                        if occupant.color != self.color:
+                            moves.append(target)  # Capture ends the ray
+                        break
+                    moves.append(target)
+                    r += dr
+                    c += dc
+        return moves
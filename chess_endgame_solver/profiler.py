@@ -0,0 +1,182 @@
+# profiler.py
+# Opt-in method instrumentation. enable() swaps counting wrappers onto a table of
+# methods and disable() puts the originals back, so nothing is paid while
+# profiling is off. Each project's profiling.py supplies the table for its engine.
+# The projects are run standalone, so this file is copied between them unchanged:
+# keep every copy identical.
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import functools
+import json
+import marshal
+import pstats
+import time
+
+FunctionKey = Tuple[str, int, str]
+# Called with the wrapped call's arguments, after it returns
+Label = Callable[..., str]
+Extra = Callable[..., Dict[str, int]]
+# (class, method, counter bumped per outermost call, section label, extra counters after the call).
+# A counter only moves on the outermost wrapped call bumping it, so a wrapped method
+# calling another with the same counter counts once.
+Target = Tuple[type, str, Optional[str], Optional[Label], Optional[Extra]]
+
+
+class Profiler:
+    """Counts and times calls to a table of methods, per call and per labelled section."""
+
+    def __init__(self, targets: List[Target]) -> None:
+        self.targets = targets
+        self.counters: Dict[str, int] = {}
+        # Label -> calls, wall time and counter deltas, e.g. per solve or per difficulty
+        self.sections: Dict[str, Dict[str, float]] = {}
+        # (file, line, name) -> [primitive calls, calls, own time, cumulative time]
+        self.functions: Dict[FunctionKey, List[float]] = {}
+        self.stats: Dict[FunctionKey, tuple] = {}
+        self._originals: List[Tuple[type, str, Any]] = []
+        self._stack: List[List[float]] = []  # [start, time spent in wrapped callees] per call in progress
+        self._active: Dict[str, int] = {}  # Counter -> wrapped calls in progress
+
+    def enable(self) -> None:
+        """Install the counting wrappers."""
+        if self._originals:
+            return
+        for owner, name, counter, label, extra in self.targets:
+            original = owner.__dict__[name]
+            self._originals.append((owner, name, original))
+            if isinstance(original, classmethod):
+                setattr(owner, name, classmethod(self._wrap(original.__func__, counter, label, extra)))
+            else:
+                setattr(owner, name, self._wrap(original, counter, label, extra))
+
+    def disable(self) -> None:
+        """Restore the original methods, leaving the collected numbers in place."""
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+
+    def __enter__(self) -> 'Profiler':
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.disable()
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def _wrap(self, func: Callable, counter: Optional[str], label: Optional[Label],
+              extra: Optional[Extra]) -> Callable:
+        """Return func wrapped to bump its counters and record its own and cumulative time."""
+        code = func.__code__
+        stats = self.functions.setdefault((code.co_filename, code.co_firstlineno, code.co_name), [0, 0, 0.0, 0.0])
+        active, stack = self._active, self._stack
+        depth = [0]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if counter is not None:
+                if not active.get(counter):
+                    self._count(counter)
+                active[counter] = active.get(counter, 0) + 1
+            before = dict(self.counters) if label is not None else None
+            frame = [time.perf_counter(), 0.0]
+            stack.append(frame)
+            depth[0] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - frame[0]
+                depth[0] -= 1
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                stats[1] += 1
+                stats[2] += elapsed - frame[1]
+                if depth[0] == 0:  # Recursive calls only count towards cumulative time once
+                    stats[0] += 1
+                    stats[3] += elapsed
+                if counter is not None:
+                    active[counter] -= 1
+                if extra is not None:
+                    for name, amount in extra(*args, **kwargs).items():
+                        self._count(name, amount)
+                if label is not None:
+                    self._record(label(*args, **kwargs), elapsed, before)
+
+        return wrapper
+
+    def _record(self, label: str, elapsed: float, before: Dict[str, int]) -> None:
+        """Add one call's wall time and counter deltas to its section."""
+        section = self.sections.setdefault(label, {'calls': 0, 'elapsed': 0.0, 'max_elapsed': 0.0})
+        section['calls'] += 1
+        section['elapsed'] += elapsed
+        section['max_elapsed'] = max(section['max_elapsed'], elapsed)
+        for name, value in self.counters.items():
+            if value != before.get(name, 0):
+                section[name] = section.get(name, 0) + value - before.get(name, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters, sections and per-function timings as plain JSON-ready data."""
+        functions = [{'file': key[0], 'line': key[1], 'function': key[2], 'primitive_calls': value[0],
+                      'calls': value[1], 'tottime': value[2], 'cumtime': value[3]}
+                     for key, value in self.functions.items() if value[1]]
+        return {'counters': dict(self.counters),
+                'sections': {label: dict(section) for label, section in self.sections.items()},
+                'functions': functions}
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Add a to_dict() result, e.g. one sent back from a worker process."""
+        for name, amount in data['counters'].items():
+            self._count(name, amount)
+        for label, other in data['sections'].items():
+            section = self.sections.setdefault(label, {'calls': 0, 'elapsed': 0.0, 'max_elapsed': 0.0})
+            for name, value in other.items():
+                if name == 'max_elapsed':
+                    section[name] = max(section[name], value)
+                else:
+                    section[name] = section.get(name, 0) + value
+        for entry in data['functions']:
+            stats = self.functions.setdefault((entry['file'], entry['line'], entry['function']), [0, 0, 0.0, 0.0])
+            stats[0] += entry['primitive_calls']
+            stats[1] += entry['calls']
+            stats[2] += entry['tottime']
+            stats[3] += entry['cumtime']
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Return the collected data as JSON, also writing it to path if given."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+        return text
+
+    def create_stats(self) -> None:
+        """Fill self.stats in cProfile's format, so pstats.Stats(profiler) works."""
+        self.stats = {key: (value[0], value[1], value[2], value[3], {})
+                      for key, value in self.functions.items() if value[1]}
+
+    def dump_stats(self, path: str) -> None:
+        """Write the per-function timings as a cProfile-style file for pstats or snakeviz."""
+        self.create_stats()
+        with open(path, 'wb') as f:
+            marshal.dump(self.stats, f)
+
+    def print_stats(self, sort: str = 'cumulative') -> None:
+        """Print the sections and counters, then a pstats table of the wrapped functions."""
+        for label, section in sorted(self.sections.items()):
+            calls = section['calls']
+            counters = ', '.join(f"{name} {value / calls:.1f}" for name, value in sorted(section.items())
+                                 if name not in ('calls', 'elapsed', 'max_elapsed'))
+            print(f"{label}: {calls} calls, {section['elapsed'] / calls * 1000:.3f} ms mean, "
+                  f"{section['max_elapsed'] * 1000:.3f} ms max" + (f"; per call {counters}" if counters else ""))
+        print("Totals: " + ', '.join(f"{name} {value}" for name, value in sorted(self.counters.items())))
+        if any(value[1] for value in self.functions.values()):
+            pstats.Stats(self).sort_stats(sort).print_stats()
+
+
+def write_profile(profiler: Profiler, path: str) -> None:
+    """Write .prof paths as cProfile-style stats and anything else as JSON."""
+    if path.endswith('.prof'):
+        profiler.dump_stats(path)
+    else:
+        profiler.to_json(path)
@@ -0,0 +1,52 @@
+from board import Board
+from bitboard import BitBoard
+from piece import Piece
+from profiler import Target, write_profile  # write_profile is re-exported for main.py
+from tablebase import Tablebase
+from tablefile import MappedTablebase
+from typing import Any, List
+import profiler
+
+# Opt-in instrumentation for the board and tablebase code: the methods to wrap, for
+# the generic Profiler in profiler.py. Nothing is paid while profiling is off. Example:
+#   with Profiler() as profiler:
+#       board.is_checkmate("black")
+#   profiler.print_stats()
+
+
+def _solve_label(*args: Any, **kwargs: Any) -> str:
+    return "solve"
+
+
+def _generate_label(*args: Any, **kwargs: Any) -> str:
+    return "generate"
+
+
+# (class, method, counter bumped per outermost call, section label, extra counters). A counter
+# only moves on the outermost wrapped call, so BitBoard.make_move calling Board.make_move,
+# or has_legal_move calling get_moves, counts once.
+TARGETS: List[Target] = [
+    (Board, 'make_move', 'nodes', None, None),
+    (Board, 'is_in_check', 'check_tests', None, None),
+    (Board, 'is_checkmate', 'mate_tests', None, None),
+    (Board, 'is_stalemate', 'mate_tests', None, None),
+    (Board, 'has_legal_move', 'movegen', None, None),
+    (Board, 'get_legal_moves', 'movegen', None, None),
+    (Piece, 'get_moves', 'movegen', None, None),
+    (BitBoard, 'make_move', 'nodes', None, None),
+    (BitBoard, 'is_in_check', 'check_tests', None, None),
+    (BitBoard, 'has_legal_move', 'movegen', None, None),
+    (BitBoard, 'get_legal_moves', 'movegen', None, None),
+    (Tablebase, 'value', 'table_probes', None, None),
+    (MappedTablebase, 'value', 'table_probes', None, None),
+    (Tablebase, 'best_line', None, _solve_label, None),
+    (Tablebase, 'generate', None, _generate_label, None),
+]
+
+
+class Profiler(profiler.Profiler):
+    """Counts engine work (nodes, move generation, check tests, table probes) and times it per call and per solve."""
+
+    def __init__(self, targets: List[Target] = TARGETS) -> None:
+        super().__init__(targets)
+
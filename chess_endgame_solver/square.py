@@ -1,29 +1,76 @@
+from typing import Dict, List
+
+FILES = 'abcdefgh'
+RANKS = '87654321'
+
+
 class Square:
-    def __init__(self, row: int, col: int) -> None:
-        """Initialize a square with row and column coordinates."""
+    """One of the 64 board squares. Squares are interned: Square(row, col) always
+    returns the same precreated instance, numbered 0-63 as row * 8 + col."""
+
+    __slots__ = ('row', 'col', 'index', 'name', '_hash')
+
+    def __new__(cls, row: int, col: int) -> 'Square':
+        """Return the interned square with row and column coordinates."""
         if not (0 <= row < 8 and 0 <= col < 8):
             raise ValueError("Square coordinates must be between 0 and 7")
-        self.row = row
-        self.col = col
+        return SQUARES[row * 8 + col]
+
+    @classmethod
+    def _create(cls, index: int) -> 'Square':
+        """Build the instance for an index; only used to fill SQUARES."""
+        square = object.__new__(cls)
+        square.row, square.col = divmod(index, 8)
+        square.index = index
+        square.name = FILES[square.col] + RANKS[square.row]
+        square._hash = hash((square.row, square.col))
+        return square
+
+    @classmethod
+    def from_index(cls, index: int) -> 'Square':
+        """Return the square for a 0-63 index."""
+        if not 0 <= index < 64:
+            raise ValueError("Square index must be between 0 and 63")
+        return SQUARES[index]
+
+    @classmethod
+    def from_name(cls, name: str) -> 'Square':
+        """Return the square for chess notation (e.g., 'e4')."""
+        square = SQUARES_BY_NAME.get(name.strip().lower())
+        if square is None:
+            raise ValueError(f"Invalid square {name!r}")
+        return square
+
+    def __reduce__(self):
+        """Unpickle (e.g. in a worker process) to that process's interned instance."""
+        return (Square, (self.row, self.col))
 
     def __eq__(self, other) -> bool:
         """Check if two squares are equal based on position."""
+        if self is other:
+            return True
         if not isinstance(other, Square):
             return False
-        return self.row == other.row and self.col == other.col
+        return self.index == other.index
 
     def __hash__(self) -> int:
-        """Make Square hashable for use as a dictionary key."""
-        return hash((self.row, self.col))
+        """Return the hash cached when the square was created."""
+        return self._hash
 
     def __str__(self) -> str:
         """Return chess notation (e.g., 'e4') for the square."""
-        files = 'abcdefgh'
-        ranks = '87654321'
-        return f"{files[self.col]}{ranks[self.row]}"
+        return self.name
+
+    def __repr__(self) -> str:
+        """Return the constructor call for the square."""
+        return f"Square({self.row}, {self.col})"
 
     def is_adjacent_to(self, other: 'Square') -> bool:
         """Check if this square is adjacent to another (including diagonals)."""
         dr = abs(self.row - other.row)
         dc = abs(self.col - other.col)
         return max(dr, dc) == 1 and (dr != 0 or dc != 0)
+
+
+SQUARES: List[Square] = [Square._create(i) for i in range(64)]
+SQUARES_BY_NAME: Dict[str, Square] = {square.name: square for square in SQUARES}
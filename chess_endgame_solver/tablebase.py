@@ -0,0 +1,196 @@
+from square import Square, SQUARES
+from board import Board
+from bitboard import KING_ATTACKS, bits, queen_attacks, square_index, index_square
+from array import array
+from typing import List, Optional, Tuple
+import time
+
+# Positions are indexed by (white king, black king, white queen) square indices:
+#   index = wk << 12 | bk << 6 | wq
+# One table per side to move holds the number of white moves to mate, DRAW for
+# draws (stalemate, the queen falling) or ILLEGAL for positions that can't arise:
+# pieces sharing a square, kings touching, or black in check with white to move.
+TABLE_SIZE = 64 * 64 * 64
+DRAW = 255
+UNKNOWN = 254
+ILLEGAL = 253
+
+Move = Tuple[Square, Square]
+
+
+def position_index(wk: int, bk: int, wq: int) -> int:
+    """Return the table index for the given white king, black king and white queen squares."""
+    return wk << 12 | bk << 6 | wq
+
+
+def is_placement(wk: int, bk: int, wq: int) -> bool:
+    """Check the three pieces stand on different squares with the kings apart."""
+    return wk != bk and wk != wq and bk != wq and not KING_ATTACKS[wk] >> bk & 1
+
+
+def _black_in_check(wk: int, bk: int, wq: int) -> bool:
+    return bool(queen_attacks(wq, 1 << wk | 1 << bk) >> bk & 1)
+
+
+def is_legal(wk: int, bk: int, wq: int, white_to_move: bool = True) -> bool:
+    """Check a position can arise in play: a valid placement, and black not in check with white to move."""
+    return is_placement(wk, bk, wq) and not (white_to_move and _black_in_check(wk, bk, wq))
+
+
+def _black_targets(wk: int, bk: int, wq: int) -> int:
+    """Return the mask of legal black king moves, including taking an undefended queen."""
+    # The black king is left out of the occupancy so it can't hide behind itself on the queen's line
+    attacked = KING_ATTACKS[wk] | queen_attacks(wq, 1 << wk)
+    return KING_ATTACKS[bk] & ~attacked
+
+
+def _white_moves(wk: int, bk: int, wq: int) -> List[Tuple[int, int]]:
+    """Return legal white moves as (from, to) square indices. White never captures in KQK."""
+    occupied = 1 << wk | 1 << bk | 1 << wq
+    moves = [(wk, to) for to in bits(KING_ATTACKS[wk] & ~occupied & ~KING_ATTACKS[bk])]
+    moves.extend((wq, to) for to in bits(queen_attacks(wq, occupied) & ~occupied))
+    return moves
+
+
+class Tablebase:
+    """Distance to mate for every King + Queen vs King position, built by retrograde analysis."""
+
+    def __init__(self, white_to_move: bytearray, black_to_move: bytearray) -> None:
+        self.white_to_move = white_to_move
+        self.black_to_move = black_to_move
+
+    @classmethod
+    def generate(cls) -> 'Tablebase':
+        """Build the full table: mark every mate, then walk back one white and one black move per layer."""
+        wtm = bytearray([ILLEGAL]) * TABLE_SIZE
+        btm = bytearray([ILLEGAL]) * TABLE_SIZE
+        # Legal black replies not yet known to lose, per black-to-move position
+        remaining = array('b', [0]) * TABLE_SIZE
+
+        frontier = []
+        for wk in range(64):
+            for bk in range(64):
+                for wq in range(64):
+                    if not is_placement(wk, bk, wq):
+                        continue
+                    index = wk << 12 | bk << 6 | wq
+                    if not _black_in_check(wk, bk, wq):
+                        wtm[index] = UNKNOWN
+                    targets = _black_targets(wk, bk, wq)
+                    if targets:
+                        btm[index] = UNKNOWN
+                        remaining[index] = targets.bit_count()
+                        if targets >> wq & 1:
+                            remaining[index] += 64  # Taking the queen draws, so this can never reach zero
+                    elif _black_in_check(wk, bk, wq):
+                        btm[index] = 0  # Checkmate
+                        frontier.append(index)
+                    else:
+                        btm[index] = DRAW  # Stalemate
+
+        depth = 0
+        while frontier:
+            # White moves into a lost black-to-move position win in depth + 1
+            won = []
+            for index in frontier:
+                wk, bk, wq = index >> 12, index >> 6 & 63, index & 63
+                occupied = 1 << wk | 1 << bk | 1 << wq
+                for prev in bits(KING_ATTACKS[wk] & ~occupied & ~KING_ATTACKS[bk]):
+                    prev_index = prev << 12 | bk << 6 | wq
+                    if wtm[prev_index] == UNKNOWN:
+                        wtm[prev_index] = depth + 1
+                        won.append(prev_index)
+                for prev in bits(queen_attacks(wq, occupied) & ~occupied):
+                    prev_index = wk << 12 | bk << 6 | prev
+                    if wtm[prev_index] == UNKNOWN:
+                        wtm[prev_index] = depth + 1
+                        won.append(prev_index)
+
+            # A black-to-move position is lost once every reply walks into a won position
+            frontier = []
+            for index in won:
+                wk, bk, wq = index >> 12, index >> 6 & 63, index & 63
+                for prev in bits(KING_ATTACKS[bk] & ~(1 << wk | 1 << wq) & ~KING_ATTACKS[wk]):
+                    prev_index = wk << 12 | prev << 6 | wq
+                    if btm[prev_index] == UNKNOWN:
+                        remaining[prev_index] -= 1
+                        if remaining[prev_index] == 0:
+                            btm[prev_index] = depth + 1
+                            frontier.append(prev_index)
+            depth += 1
+
+        for table in (wtm, btm):
+            table[:] = table.replace(bytes([UNKNOWN]), bytes([DRAW]))
+        return cls(wtm, btm)
+
+    def value(self, wk: int, bk: int, wq: int, white_to_move: bool) -> int:
+        """Return the raw table entry for a position: white moves to mate, DRAW or ILLEGAL."""
+        table = self.white_to_move if white_to_move else self.black_to_move
+        return table[wk << 12 | bk << 6 | wq]
+
+    def dtm(self, wk: int, bk: int, wq: int, white_to_move: bool = True) -> Optional[int]:
+        """Return the number of white moves to mate, or None for a draw. Raises ValueError for an illegal position."""
+        value = self.value(wk, bk, wq, white_to_move)
+        if value == ILLEGAL:
+            raise ValueError(f"Illegal position: {SQUARES[wk].name},{SQUARES[bk].name},{SQUARES[wq].name},"
+                             f"{'w' if white_to_move else 'b'}")
+        return None if value == DRAW else value
+
+    def probe(self, white_king: Square, black_king: Square, white_queen: Square,
+              white_to_move: bool = True) -> Optional[int]:
+        """Return the distance to mate for a position given as three Squares."""
+        return self.dtm(square_index(white_king), square_index(black_king), square_index(white_queen),
+                        white_to_move)
+
+    def probe_board(self, board: Board, white_to_move: bool = True) -> Optional[int]:
+        """Return the distance to mate for a KQK Board."""
+        queens = [p for p in board.pieces.values() if p.type == "queen" and p.clr == "white"]
+        if len(board.pieces) != 3 or len(queens) != 1:
+            raise ValueError("Board must hold exactly a white king, a black king and a white queen")
+        return self.probe(board.get_king("white").pos, board.get_king("black").pos, queens[0].pos,
+                          white_to_move)
+
+    def best_line(self, wk: int, bk: int, wq: int, white_to_move: bool = True) -> List[Tuple[int, int]]:
+        """Return the optimal moves to mate as (from, to) square indices, or [] for a draw or mate."""
+        line = []
+        value = self.dtm(wk, bk, wq, white_to_move)
+        if value is None:
+            return line
+        while value > 0 or white_to_move:
+            if white_to_move:
+                # Quickest mate: step into a black-to-move position lost one move sooner
+                for move in _white_moves(wk, bk, wq):
+                    nwk, nwq = (move[1], wq) if move[0] == wk else (wk, move[1])
+                    if self.value(nwk, bk, nwq, False) == value - 1:
+                        wk, wq = nwk, nwq
+                        break
+                else:
+                    raise RuntimeError("Table is inconsistent")
+                value -= 1
+            else:
+                # Longest defence: the reply that leaves white furthest from mate
+                best, best_value = None, -1
+                for to in bits(_black_targets(wk, bk, wq)):
+                    reply_value = self.value(wk, to, wq, True)
+                    if reply_value > best_value:
+                        best, best_value = to, reply_value
+                move = (bk, best)
+                bk, value = best, best_value
+            line.append(move)
+            white_to_move = not white_to_move
+        return line
+
+    def solve(self, white_king: Square, black_king: Square, white_queen: Square,
+              white_to_move: bool = True) -> Tuple[Optional[int], List[Move]]:
+        """Return (moves to mate, optimal line as Square pairs) for a position, or (None, []) for a draw."""
+        wk, bk, wq = square_index(white_king), square_index(black_king), square_index(white_queen)
+        line = self.best_line(wk, bk, wq, white_to_move)
+        return self.dtm(wk, bk, wq, white_to_move), [(index_square(a), index_square(b)) for a, b in line]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    tablebase = Tablebase.generate()
+    elapsed = time.perf_counter() - start
+    longest = max(v for v in tablebase.white_to_move if v not in (DRAW, ILLEGAL))
+    print(f"Built KQK tablebase in {elapsed:.1f}s; longest mate is {longest} moves")
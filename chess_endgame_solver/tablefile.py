@@ -0,0 +1,114 @@
+from tablebase import Tablebase, ILLEGAL
+from typing import List
+import mmap
+import os
+import struct
+import sys
+
+# On-disk KQK table, reduced by the 8 symmetries of the board (no pawns or castling
+# means every rotation and reflection preserves the result). The black king is
+# moved into the triangle a8-d8-d5, i.e. row <= 3, col <= 3, col >= row in square
+# index terms, leaving 10 squares. The file is a header followed by one byte per
+# entry: two blocks (white then black to move) of 10 * 64 * 64 entries, indexed by
+#   triangle index * 4096 + white king * 64 + white queen
+TABLE_MAGIC = b'KQKDTM\x00\x00'
+TABLE_VERSION = 2  # 2 separates illegal positions from draws
+TABLE_HEADER = struct.Struct('<8sIII')  # magic, version, triangle squares, entries per side
+TRIANGLE = [r * 8 + c for r in range(4) for c in range(r, 4)]
+TRIANGLE_INDEX = [TRIANGLE.index(i) if i in TRIANGLE else -1 for i in range(64)]
+SIDE_SIZE = len(TRIANGLE) * 64 * 64
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kqk.tb')
+
+
+def _transform(index: int, flip_rows: bool, flip_cols: bool, transpose: bool) -> int:
+    row, col = divmod(index, 8)
+    if flip_rows:
+        row = 7 - row
+    if flip_cols:
+        col = 7 - col
+    if transpose:
+        row, col = col, row
+    return row * 8 + col
+
+
+def _symmetry_to_triangle(index: int) -> List[int]:
+    """Return the square mapping that carries the given square into the triangle."""
+    row, col = divmod(index, 8)
+    flip_rows, flip_cols = row > 3, col > 3
+    row, col = (7 - row if flip_rows else row), (7 - col if flip_cols else col)
+    return [_transform(i, flip_rows, flip_cols, row > col) for i in range(64)]
+
+
+# CANONICAL[bk] maps every square so that bk lands in the triangle
+CANONICAL: List[List[int]] = [_symmetry_to_triangle(i) for i in range(64)]
+TRANSPOSE: List[int] = [_transform(i, False, False, True) for i in range(64)]
+ON_DIAGONAL: List[bool] = [i >> 3 == i & 7 for i in range(64)]
+BELOW_DIAGONAL: List[bool] = [i >> 3 > i & 7 for i in range(64)]
+
+
+def canonical_index(wk: int, bk: int, wq: int) -> int:
+    """Return the reduced table index of a position, with no allocation."""
+    mapping = CANONICAL[bk]
+    wk, bk, wq = mapping[wk], mapping[bk], mapping[wq]
+    if ON_DIAGONAL[bk]:
+        # The diagonal is its own mirror, so pick the reflection that keeps the
+        # white king (then the queen) on or above it
+        if BELOW_DIAGONAL[wk] or (ON_DIAGONAL[wk] and BELOW_DIAGONAL[wq]):
+            wk, wq = TRANSPOSE[wk], TRANSPOSE[wq]
+    return TRIANGLE_INDEX[bk] << 12 | wk << 6 | wq
+
+
+def write_table(tablebase: Tablebase, path: str = DEFAULT_PATH) -> None:
+    """Write a generated tablebase in the reduced format, replacing any file at path atomically."""
+    data = bytearray(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(TRIANGLE), SIDE_SIZE))
+    for full in (tablebase.white_to_move, tablebase.black_to_move):
+        reduced = bytearray([ILLEGAL]) * SIDE_SIZE
+        for triangle_index, bk in enumerate(TRIANGLE):
+            for wk in range(64):
+                base = wk << 12 | bk << 6
+                start = triangle_index << 12 | wk << 6
+                reduced[start:start + 64] = full[base:base + 64]
+        data += reduced
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class MappedTablebase(Tablebase):
+    """Read-only tablebase probed straight out of a memory-mapped file.
+
+    Probes only index into the shared mapping, so many processes can use one
+    table for the cost of the page cache."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = TABLE_HEADER.unpack_from(self._map)
+        if header != (TABLE_MAGIC, TABLE_VERSION, len(TRIANGLE), SIDE_SIZE) or \
+                len(self._map) != TABLE_HEADER.size + 2 * SIDE_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {TABLE_VERSION} KQK table")
+        view = memoryview(self._map)
+        super().__init__(view[TABLE_HEADER.size:TABLE_HEADER.size + SIDE_SIZE],
+                         view[TABLE_HEADER.size + SIDE_SIZE:])
+
+    def value(self, wk: int, bk: int, wq: int, white_to_move: bool) -> int:
+        """Return the raw table entry for a position: white moves to mate, DRAW or ILLEGAL."""
+        table = self.white_to_move if white_to_move else self.black_to_move
+        return table[canonical_index(wk, bk, wq)]
+
+
+def load_table(path: str = DEFAULT_PATH) -> MappedTablebase:
+    """Map the table at path, generating and writing it first if it is missing or stale."""
+    try:
+        return MappedTablebase(path)
+    except (OSError, ValueError):
+        write_table(Tablebase.generate(), path)
+        return MappedTablebase(path)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    write_table(Tablebase.generate(), target)
+    print(f"Wrote {target} ({os.path.getsize(target)} bytes)")
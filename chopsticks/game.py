@@ -1,34 +1,88 @@
 # game.py
+from collections import Counter
+from state import get_space, realign
+
+class GameResult:
+    def __init__(self, winner, reason, moves):
+        self.winner = winner  # None for a draw
+        self.reason = reason  # 'defeat', 'repetition' or 'move limit'
+        self.moves = moves
+
+    def is_draw(self):
+        return self.winner is None
+
 class Game:
-    def __init__(self, player1, player2):
+    def __init__(self, player1, player2, verbose=True, max_moves=None, repetitions=3):
         self.player1 = player1
         self.player2 = player2
         self.current_player = player1
         self.opponent = player2
+        self.verbose = verbose
+        self.max_moves = max_moves
+        # The game is drawn once the same position comes up this many times (None to disable)
+        self.repetitions = repetitions
+        self.moves = 0
+        self.history = []
+        self.space = get_space(player1.rules)
+        player1.opponent, player2.opponent = player2, player1
 
     def display_state(self):
         p1, p2 = self.player1, self.player2
-        max_height = max(p1.top, p1.bottom, p2.top, p2.bottom)
-        nw_lines = ['___' if i < p1.top else '   ' for i in range(max_height)][::-1]
-        ne_lines = ['___' if i < p2.top else '   ' for i in range(max_height)][::-1]
-        sw_lines = ['___' if i < p1.bottom else '   ' for i in range(max_height)][::-1]
-        se_lines = ['___' if i < p2.bottom else '   ' for i in range(max_height)][::-1]
+        max_height = max(p1.hands + p2.hands)
         boundary_width = 22
         print(f"{p1.name}          {p2.name}")
         print("-" * boundary_width)
-        for i in range(max_height):
-            print(f"{nw_lines[i]}          {ne_lines[i]}")
-        print('')
-        print("-" * boundary_width)
-        for i in range(max_height):
-            print(f"{sw_lines[i]}          {se_lines[i]}")
-        print("-" * boundary_width)
+        for hand in range(len(p1.hands)):
+            west_lines = ['___' if i < p1.hands[hand] else '   ' for i in range(max_height)][::-1]
+            east_lines = ['___' if i < p2.hands[hand] else '   ' for i in range(max_height)][::-1]
+            for i in range(max_height):
+                print(f"{west_lines[i]}          {east_lines[i]}")
+            if hand < len(p1.hands) - 1:
+                print('')
+            print("-" * boundary_width)
+
+    def sync_players(self, state):
+        # state is from the current player's point of view
+        current_hands, opponent_hands = self.space.decode(state)
+        self.current_player.set_hands(*realign(self.current_player.hands, current_hands))
+        self.opponent.set_hands(*realign(self.opponent.hands, opponent_hands))
 
     def play(self):
-        while not self.player1.is_defeated() and not self.player2.is_defeated():
-            self.display_state()
-            print(f"\n{self.current_player.name}'s turn")
-            self.current_player.make_move(self.opponent)
+        # Players move on the packed state; the Player objects are only synced for display.
+        state = self.space.encode(self.current_player.get_hands(), self.opponent.get_hands())
+        self.moves = 0
+        self.history = []
+        # A packed state is relative to the player to move, so key positions on who that is
+        seen = Counter()
+        while True:
+            if self.space.is_lost(state):
+                result = GameResult(self.opponent, 'defeat', self.moves)
+                break
+            key = (state, self.current_player is self.player1)
+            seen[key] += 1
+            if self.repetitions is not None and seen[key] >= self.repetitions:
+                result = GameResult(None, 'repetition', self.moves)
+                break
+            if self.max_moves is not None and self.moves >= self.max_moves:
+                result = GameResult(None, 'move limit', self.moves)
+                break
+            if self.verbose:
+                self.display_state()
+                print(f"\n{self.current_player.name}'s turn")
+            next_state = self.current_player.make_move(state, self.history)
+            self.history.append(state)
+            state = next_state
+            self.moves += 1
             self.current_player, self.opponent = self.opponent, self.current_player
-        self.display_state()
-        print(f"{self.player2.name if self.player1.is_defeated() else self.player1.name} wins!")
+            if self.verbose:
+                self.sync_players(state)
+        self.sync_players(state)
+        if self.verbose:
+            self.display_state()
+            if result.reason == 'repetition':
+                print(f"Draw: the same position came up {self.repetitions} times.")
+            elif result.reason == 'move limit':
+                print(f"Draw: no winner after {self.moves} moves.")
+            else:
+                print(f"{result.winner.name} wins!")
+        return result
@@ -1,52 +1,66 @@
 # human_player.py
 from player import Player
+from state import SPLIT, get_space, realign
 
 class HumanPlayer(Player):
-    def make_move(self, opponent):
-        valid_attacks = {f"{h}{o}" for h, o in [('t', 't'), ('t', 'b'), ('b', 't'), ('b', 'b')] 
-                         if (h == 't' and self.top > 0 or h == 'b' and self.bottom > 0) and 
-                            (o == 't' and opponent.top > 0 or o == 'b' and opponent.bottom > 0)}
-        
+    def make_move(self, state, history=()):
+        # Moves are entered against the hands as displayed, so lay the state's counts onto them
+        space = get_space(self.rules)
+        opponent = self.opponent
+        mine, theirs = space.decode(state)
+        my_hands, their_hands = realign(self.hands, mine), realign(opponent.hands, theirs)
+        keys = self.rules.hand_keys()
+        labels = self.rules.hand_labels()
+        fingers = self.rules.fingers
+        valid_attacks = {f"{keys[h]}{keys[o]}" for h in range(len(keys)) for o in range(len(keys))
+                         if my_hands[h] > 0 and their_hands[o] > 0}
+        valid_attack_states = {space.successors[i] for i in space.moves(state) if not space.flags[i] & SPLIT}
+        valid_splits = {space.successors[i] for i in space.moves(state) if space.flags[i] & SPLIT}
+
         while True:
             action = input("Move (a for attack, s for split): ").lower().strip()
-            
+
             if action == 'a':
-                attack = input(f"Attack ({', '.join(valid_attacks)}): ").lower().strip()
+                attack = input(f"Attack ({', '.join(sorted(valid_attacks))}): ").lower().strip()
                 if attack in valid_attacks:
-                    my_hand, opp_hand = attack[0], attack[1]
-                    my_value = self.top if my_hand == 't' else self.bottom
-                    opp_value = opponent.top if opp_hand == 't' else opponent.bottom
-                    new_value = my_value + opp_value
-                    if new_value == 5:
-                        new_value = 0
-                    elif new_value > 5:
-                        new_value -= 5
-                    # Map 't' to 'top' and 'b' to 'bottom'
-                    opp_hand_attr = 'top' if opp_hand == 't' else 'bottom'
-                    setattr(opponent, opp_hand_attr, new_value)
-                    print(f"{self.name} attacks.")
-                    return
-                print(f"Invalid attack. Valid options: {', '.join(valid_attacks)}")
+                    my_hand, opp_hand = keys.index(attack[0]), keys.index(attack[1])
+                    attacked = list(their_hands)
+                    attacked[opp_hand] = self.rules.attack(attacked[opp_hand], my_hands[my_hand])
+                    new_state = space.encode(attacked, my_hands)
+                    if new_state in valid_attack_states:
+                        self.set_hands(*my_hands)
+                        opponent.set_hands(*attacked)
+                        print(f"{self.name} attacks.")
+                        return new_state
+                print(f"Invalid attack. Valid options: {', '.join(sorted(valid_attacks))}")
                 continue
-            
+
             elif action == 's':
-                total = self.total_fingers()
-                possible_splits = [(m['top'], m['bottom']) for m in self.get_possible_moves(opponent) if m['type'] == 'split']
-                if not possible_splits:
+                total = sum(my_hands)
+                if not valid_splits:
                     print("No valid splits possible.")
                     continue
-                top_str = input("Top hand chopsticks (0-4, q to quit): ").lower().strip()
-                if top_str == 'q':
+                # Ask for every hand but the last, which takes whatever is left
+                new_hands = []
+                for label in labels[:-1]:
+                    value = input(f"{label} chopsticks (0-{fingers - 1}, q to quit): ").lower().strip()
+                    if value == 'q':
+                        break
+                    try:
+                        new_hands.append(int(value))
+                    except ValueError:
+                        print(f"Enter a number (0-{fingers - 1}) or 'q'.")
+                        break
+                if len(new_hands) < len(labels) - 1:
                     continue
-                try:
-                    top = int(top_str)
-                    bottom = total - top
-                    if (top, bottom) in possible_splits:
-                        self.set_hands(top, bottom)
+                new_hands.append(total - sum(new_hands))
+                if all(0 <= value < fingers for value in new_hands):
+                    new_state = space.encode(their_hands, new_hands)
+                    if new_state in valid_splits:
+                        self.set_hands(*new_hands)
+                        opponent.set_hands(*their_hands)
                         print(f"{self.name} splits.")
-                        return
-                    print("Invalid split.")
-                except ValueError:
-                    print("Enter a number (0-4) or 'q'.")
+                        return new_state
+                print("Invalid split.")
             else:
                 print("Invalid move. Use 'a' or 's'.")
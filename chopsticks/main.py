@@ -1,44 +1,51 @@
 # main.py
+import argparse
 from human import HumanPlayer
 from computer import ComputerPlayer
 from game import Game
+from rules import add_rules_arguments, rules_from_args
 
 def main():
-    print("\nWelcome to Chopsticks!\nCommands:\n  a then tt/tb/bt/bb: attack\n  s then 0-4 or q: split")
+    parser = argparse.ArgumentParser(description="Play chopsticks")
+    add_rules_arguments(parser)
+    rules = rules_from_args(parser.parse_args(), parser)
+
+    attacks = '/'.join(mine + theirs for mine in rules.hand_keys() for theirs in rules.hand_keys())
+    print(f"\nWelcome to Chopsticks!\nCommands:\n  a then {attacks}: attack\n  s then 0-{rules.fingers - 1} or q: split")
     print("Modes:\n  cc: Computer vs. Computer\n  pp: Player vs. Player\n  cp: Computer vs. Player (Computer first)\n  pc: Player vs. Computer (Player first)")
     mode = input("Choose mode: ").lower().strip()
     
     if mode == 'cc':  # Computer vs. Computer
-        difficulty1 = input("Difficulty for Computer 1 (e: Easy, m: Medium, h: Hard): ").lower().strip()
-        if difficulty1 not in ['e', 'm', 'h']:
+        difficulty1 = input("Difficulty for Computer 1 (e: Easy, m: Medium, h: Hard, s: Search): ").lower().strip()
+        if difficulty1 not in ['e', 'm', 'h', 's']:
             print("Invalid difficulty for Computer 1.")
             return
-        difficulty2 = input("Difficulty for Computer 2 (e: Easy, m: Medium, h: Hard): ").lower().strip()
-        if difficulty2 not in ['e', 'm', 'h']:
+        difficulty2 = input("Difficulty for Computer 2 (e: Easy, m: Medium, h: Hard, s: Search): ").lower().strip()
+        if difficulty2 not in ['e', 'm', 'h', 's']:
             print("Invalid difficulty for Computer 2.")
             return
-        player1 = ComputerPlayer("Computer 1", difficulty1)
-        player2 = ComputerPlayer("Computer 2", difficulty2)
+        player1 = ComputerPlayer("Computer 1", difficulty1, rules)
+        player2 = ComputerPlayer("Computer 2", difficulty2, rules)
     
     elif mode == 'pp':  # Player vs. Player
-        player1 = HumanPlayer(input("Player 1 name: "))
-        player2 = HumanPlayer(input("Player 2 name: "))
+        player1 = HumanPlayer(input("Player 1 name: "), rules)
+        player2 = HumanPlayer(input("Player 2 name: "), rules)
     
     elif mode == 'cp':  # Computer vs. Player (Computer first)
-        difficulty = input("Difficulty for Computer (e: Easy, m: Medium, h: Hard): ").lower().strip()
-        if difficulty not in ['e', 'm', 'h']:
+        difficulty = input("Difficulty for Computer (e: Easy, m: Medium, h: Hard, s: Search): ").lower().strip()
+        if difficulty not in ['e', 'm', 'h', 's']:
             print("Invalid difficulty.")
             return
-        player1 = ComputerPlayer("Computer", difficulty)
-        player2 = HumanPlayer("Player")
+        player1 = ComputerPlayer("Computer", difficulty, rules)
+        player2 = HumanPlayer("Player", rules)
     
     elif mode == 'pc':  # Player vs. Computer (Player first)
-        difficulty = input("Difficulty for Computer (e: Easy, m: Medium, h: Hard): ").lower().strip()
-        if difficulty not in ['e', 'm', 'h']:
+        difficulty = input("Difficulty for Computer (e: Easy, m: Medium, h: Hard, s: Search): ").lower().strip()
+        if difficulty not in ['e', 'm', 'h', 's']:
             print("Invalid difficulty.")
             return
-        player1 = HumanPlayer("Player")
-        player2 = ComputerPlayer("Computer", difficulty)
+        player1 = HumanPlayer("Player", rules)
+        player2 = ComputerPlayer("Computer", difficulty, rules)
     
     else:
         print("Invalid mode. Use 'cc', 'pp', 'cp', or 'pc'.")
@@ -1,38 +1,30 @@
 from abc import ABC, abstractmethod
+from rules import DEFAULT_RULES
 
 class Player(ABC):
-    def __init__(self, name):
+    def __init__(self, name, rules=DEFAULT_RULES):
         self.name = name
-        self.top = 1
-        self.bottom = 1
+        self.rules = rules
+        self.hands = [1] * rules.hands
+        self.opponent = None  # Set by Game
 
     def get_hands(self):
-        return (self.top, self.bottom)
+        return tuple(self.hands)
 
-    def set_hands(self, top, bottom):
-        self.top = top if top < 5 else 0
-        self.bottom = bottom if bottom < 5 else 0
+    def set_hands(self, *hands):
+        self.hands = [value if value < self.rules.fingers else 0 for value in hands]
+
+    def reset_hands(self):
+        self.hands = [1] * self.rules.hands
 
     def is_defeated(self):
-        return self.top == 0 and self.bottom == 0
+        return not any(self.hands)
 
     def total_fingers(self):
-        return self.top + self.bottom
-
-    def get_possible_moves(self, opponent):
-        moves = []
-        for hand in ['top', 'bottom']:
-            if getattr(self, hand) > 0:
-                for opp_hand in ['top', 'bottom']:
-                    if getattr(opponent, opp_hand) > 0:
-                        moves.append({'type': 'attack', 'hand': hand, 'opp_hand': opp_hand})
-        total = self.total_fingers()
-        for a in range(5):
-            b = total - a
-            if (0 <= b <= 4 and (a, b) != (self.top, self.bottom) and (a, b) != (self.bottom, self.top)):
-                moves.append({'type': 'split', 'top': a, 'bottom': b})
-        return moves
+        return sum(self.hands)
 
     @abstractmethod
-    def make_move(self, opponent):
-        pass
+    def make_move(self, state, history=()):
+        # Given the packed state (see state.py) with this player to move and the
+        # earlier states of the game, return the packed state after the move
+        pass
\ No newline at end of file
@@ -0,0 +1,41 @@
+# profiling.py
+# Opt-in instrumentation for the computer players: the engine methods to wrap, for
+# the generic Profiler in profiler.py. Nothing is paid while profiling is off. Example:
+#   with Profiler() as profiler:
+#       Game(ComputerPlayer("A", 's'), ComputerPlayer("B", 'h'), verbose=False).play()
+#   profiler.print_stats()
+import profiler
+from computer import ComputerPlayer
+from profiler import write_profile  # Re-exported for the command-line tools
+from search import Searcher
+from solver import Solver
+from state import StateSpace
+
+
+def _move_label(player, *args, **kwargs):
+    return f"make_move[{player.difficulty}]"
+
+
+def _search_counters(player, *args, **kwargs):
+    # The searcher already counts its own nodes and TT traffic; fold them in per move
+    if player.searcher is None:
+        return {}
+    stats = player.searcher.stats
+    return {'nodes': stats.nodes, 'tt_hits': stats.tt_hits, 'tt_misses': stats.tt_probes - stats.tt_hits}
+
+
+# (class, method, counter bumped per outermost call, section label, extra counters after the call)
+TARGETS = [
+    (ComputerPlayer, 'make_move', 'moves', _move_label, _search_counters),
+    (Searcher, 'search', None, None, None),
+    (StateSpace, 'moves', 'movegen', None, None),
+    (StateSpace, 'is_lost', 'terminal_tests', None, None),
+    (Solver, 'lookup', 'table_probes', None, None),
+    (Solver, 'best_move', 'table_probes', None, None),
+]
+
+
+class Profiler(profiler.Profiler):
+    def __init__(self, targets=TARGETS):
+        super().__init__(targets)
+
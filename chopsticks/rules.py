@@ -0,0 +1,65 @@
+# rules.py
+from string import ascii_lowercase, digits
+
+# Single characters naming hands at the prompt when there aren't exactly two
+HAND_KEYS = digits[1:] + ascii_lowercase
+class Rules:
+    def __init__(self, fingers=5, hands=2, rollover=True, transfers=True, suicide_splits=True):
+        if fingers < 2:
+            raise ValueError(f"fingers must be at least 2, got {fingers}")
+        if not 1 <= hands <= len(HAND_KEYS):
+            raise ValueError(f"hands must be between 1 and {len(HAND_KEYS)}, got {hands}")
+        self.fingers = fingers  # A hand reaching this many fingers is dead
+        self.hands = hands  # Hands per player
+        self.rollover = rollover  # Overshooting wraps around (rollover) or kills the hand (cutoff)
+        self.transfers = transfers  # Fingers may be moved between your own hands (splits)
+        self.suicide_splits = suicide_splits  # A split may empty one of your own hands
+
+    def key(self):
+        return (self.fingers, self.hands, self.rollover, self.transfers, self.suicide_splits)
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return (f"Rules(fingers={self.fingers}, hands={self.hands}, rollover={self.rollover}, "
+                f"transfers={self.transfers}, suicide_splits={self.suicide_splits})")
+
+    def attack(self, value, attack_value):
+        new_value = value + attack_value
+        if new_value == self.fingers:
+            return 0
+        elif new_value > self.fingers:
+            return new_value - self.fingers if self.rollover else 0
+        return new_value
+
+    def hand_keys(self):
+        # Single characters used to name hands at the prompt, e.g. 'tb' in an attack
+        return ('t', 'b') if self.hands == 2 else tuple(HAND_KEYS[:self.hands])
+
+    def hand_labels(self):
+        return ('Top hand', 'Bottom hand') if self.hands == 2 else tuple(f"Hand {key}" for key in self.hand_keys())
+
+
+DEFAULT_RULES = Rules()
+
+
+def add_rules_arguments(parser):
+    parser.add_argument('--fingers', type=int, default=5, help="fingers that kill a hand (default: 5)")
+    parser.add_argument('--hands', type=int, default=2, help="hands per player (default: 2)")
+    parser.add_argument('--cutoff', action='store_true', help="overshooting kills a hand instead of rolling over")
+    parser.add_argument('--no-transfers', action='store_true', help="disallow splits")
+    parser.add_argument('--no-suicide', action='store_true', help="disallow splits that empty a hand")
+
+
+def rules_from_args(args, parser=None):
+    # Invalid rules are reported through parser.error when a parser is given
+    try:
+        return Rules(args.fingers, args.hands, not args.cutoff, not args.no_transfers, not args.no_suicide)
+    except ValueError as e:
+        if parser is None:
+            raise
+        parser.error(str(e))
@@ -0,0 +1,199 @@
+# search.py
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from state import get_space
+
+WIN_SCORE = 1000
+DRAW_SCORE = 0
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.depth = 0
+        self.value = 0
+        self.elapsed = 0.0
+
+    def hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def report(self):
+        return (f"searched {self.nodes} nodes to depth {self.depth} in {self.elapsed * 1000:.1f} ms "
+                f"(TT hit rate {self.hit_rate():.0%})")
+
+
+class TranspositionTable:
+    # Bounded table keyed on the packed state, evicting the least recently used entry
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, state):
+        entry = self.entries.get(state)
+        if entry is not None:
+            self.entries.move_to_end(state)
+        return entry
+
+    def put(self, state, entry):
+        self.entries[state] = entry
+        self.entries.move_to_end(state)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+@lru_cache(maxsize=None)
+def evaluation_table(space):
+    # Difference in live hands, from the point of view of the player to move
+    live = [sum(1 for value in hands if value > 0) for hands in space.hands]
+    return array('b', [live[state // space.num_hands] - live[state % space.num_hands]
+                       for state in range(space.size)])
+
+
+def order_moves(space, state, tt_move):
+    # TT move first, then the table order, which already puts knockout attacks first
+    if tt_move is not None:
+        yield tt_move
+    for index in space.moves(state):
+        if index != tt_move:
+            yield index
+
+
+# Mate scores are stored relative to the node so they stay valid at any ply
+def to_tt(value, ply):
+    if value > WIN_SCORE // 2:
+        return value + ply
+    if value < -WIN_SCORE // 2:
+        return value - ply
+    return value
+
+
+def from_tt(value, ply):
+    if value > WIN_SCORE // 2:
+        return value - ply
+    if value < -WIN_SCORE // 2:
+        return value + ply
+    return value
+
+
+class Searcher:
+    def __init__(self, space=None, tt_size=50000, max_depth=30, time_budget=0.05, node_budget=None):
+        self.space = space or get_space()
+        self.evaluation = evaluation_table(self.space)
+        self.table = TranspositionTable(tt_size)
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.stats = SearchStats()
+        self._deadline = None
+        self._history = frozenset()
+        self._path = set()
+
+    def search(self, state, history=()):
+        # Returns the index of the chosen move in the space's successor table.
+        # history holds the earlier states of the game, oldest first, each seen from
+        # the player to move at the time, so lines that repeat them score as draws.
+        self.stats = stats = SearchStats()
+        # Repetition keys are (state, parity of the mover relative to the root)
+        self._history = frozenset((past, distance & 1) for distance, past in enumerate(reversed(history), 1))
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget if self.time_budget is not None else None
+        best_move = self.space.first[state]
+        # Iterative deepening: keep the result of the deepest iteration that finished in budget
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, move = self._root(state, depth)
+            except BudgetExceeded:
+                break
+            best_move, stats.depth, stats.value = move, depth, value
+            if abs(value) > WIN_SCORE // 2:
+                break  # Forced result found, deeper search cannot change it
+        stats.elapsed = time.perf_counter() - start
+        return best_move
+
+    def _root(self, state, depth):
+        self._path = set(self._history)
+        self._path.add((state, 0))
+        entry = self._probe(state)
+        tt_move = entry[3] if entry is not None else None
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_index, best_value = None, -WIN_SCORE - 1
+        successors = self.space.successors
+        for index in order_moves(self.space, state, tt_move):
+            value = -self._negamax(successors[index], depth - 1, -beta, -alpha, 1)
+            if value > best_value:
+                best_index, best_value = index, value
+            alpha = max(alpha, value)
+        self.table.put(state, (depth, to_tt(best_value, 0), EXACT, best_index))
+        return best_value, best_index
+
+    def _negamax(self, state, depth, alpha, beta, ply):
+        stats = self.stats
+        stats.nodes += 1
+        if self.node_budget is not None and stats.nodes > self.node_budget:
+            raise BudgetExceeded()
+        if self._deadline is not None and stats.nodes % 256 == 0 and time.perf_counter() > self._deadline:
+            raise BudgetExceeded()
+
+        if self.space.is_lost(state):
+            return -(WIN_SCORE - ply)
+        key = (state, ply & 1)
+        if key in self._path:
+            return DRAW_SCORE  # Repeats a position on this line, so neither side can force progress
+        if depth == 0:
+            return self.evaluation[state]
+
+        alpha_orig = alpha
+        entry = self._probe(state)
+        tt_move = None
+        if entry is not None:
+            tt_depth, tt_value, flag, tt_move = entry
+            if tt_depth >= depth:
+                tt_value = from_tt(tt_value, ply)
+                if flag == EXACT:
+                    return tt_value
+                elif flag == LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_value
+
+        successors = self.space.successors
+        best_index, best_value = None, -WIN_SCORE - 1
+        self._path.add(key)
+        for index in order_moves(self.space, state, tt_move):
+            value = -self._negamax(successors[index], depth - 1, -beta, -alpha, ply + 1)
+            if value > best_value:
+                best_index, best_value = index, value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        self._path.discard(key)
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(state, (depth, to_tt(best_value, ply), flag, best_index))
+        return best_value
+
+    def _probe(self, state):
+        self.stats.tt_probes += 1
+        entry = self.table.get(state)
+        if entry is not None:
+            self.stats.tt_hits += 1
+        return entry
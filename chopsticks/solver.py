@@ -0,0 +1,170 @@
+# solver.py
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from functools import lru_cache
+from rules import DEFAULT_RULES
+from state import get_space
+
+# Results are from the point of view of the player to move
+WIN, LOSS, DRAW = 1, -1, 0
+UNKNOWN = 2
+
+
+# Solved tables are cached on disk as a header followed by one little-endian
+# int16 per packed state, so later runs can map them instead of solving again
+TABLE_MAGIC = b'CHOPSTIX'
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct('<8sIIIII4x')
+TABLE_DIR = os.environ.get('CHOPSTICKS_TABLES', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables'))
+
+
+class Solver:
+    def __init__(self, space, values=None):
+        self.space = space
+        # Indexed by packed state: 0 for a draw, d + 1 for a win in d moves and
+        # -(d + 1) for a loss in d moves, from the point of view of the player to move
+        self.values = values if values is not None else self._solve()
+
+    def _solve(self):
+        space = self.space
+        results = array('b', [UNKNOWN]) * space.size
+        distances = array('i', [0]) * space.size
+        first, successors = space.first, space.successors
+        # Predecessor lists in the same flat layout as the successor table
+        counts = array('i', [0]) * (space.size + 1)
+        for child in successors:
+            counts[child + 1] += 1
+        for state in range(space.size):
+            counts[state + 1] += counts[state]
+        parents = array('i', [0]) * len(successors)
+        fill = array('i', counts)
+        for state in range(space.size):
+            for index in range(first[state], first[state + 1]):
+                child = successors[index]
+                parents[fill[child]] = state
+                fill[child] += 1
+        remaining = array('i', [first[state + 1] - first[state] for state in range(space.size)])
+
+        # Seed with finished games, then walk backwards one ply at a time
+        queue = deque()
+        for state in range(space.size):
+            if space.is_lost(state):
+                results[state], distances[state] = LOSS, 0
+                queue.append(state)
+            elif state % space.num_hands == 0:
+                # Opponent has no fingers left
+                results[state], distances[state] = WIN, 0
+                queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            result, distance = results[state], distances[state]
+            for index in range(counts[state], counts[state + 1]):
+                parent = parents[index]
+                if results[parent] != UNKNOWN:
+                    continue
+                if result == LOSS:
+                    # One move puts the opponent in a lost position
+                    results[parent], distances[parent] = WIN, distance + 1
+                    queue.append(parent)
+                else:
+                    # Lost only once every move hands the opponent a win
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0:
+                        results[parent], distances[parent] = LOSS, distance + 1
+                        queue.append(parent)
+
+        # Whatever is left can be kept going forever by both sides
+        return array('h', [(distances[state] + 1) * results[state] if results[state] != UNKNOWN else 0
+                           for state in range(space.size)])
+
+    def lookup(self, state):
+        # Returns (result, distance), with distance -1 for draws
+        value = self.values[state]
+        if value > 0:
+            return WIN, value - 1
+        elif value < 0:
+            return LOSS, -value - 1
+        return DRAW, -1
+
+    def best_move(self, state):
+        # Returns the index of the best move in the space's successor table
+        best_index, best_rank = None, None
+        successors = self.space.successors
+        for index in self.space.moves(state):
+            child = successors[index]
+            result, distance = self.lookup(child)
+            # Win as fast as possible, otherwise hold the draw, otherwise lose as slowly as possible
+            if result == LOSS:
+                rank = (2, -distance)
+            elif result == DRAW:
+                rank = (1, 0)
+            else:
+                rank = (0, distance)
+            if best_rank is None or rank > best_rank:
+                best_index, best_rank = index, rank
+        return best_index
+
+
+def rules_flags(rules):
+    return rules.rollover | rules.transfers << 1 | rules.suicide_splits << 2
+
+
+def table_path(rules):
+    return os.path.join(TABLE_DIR, f"solved_{rules.fingers}x{rules.hands}_{rules_flags(rules)}.bin")
+
+
+def save_table(solver, path):
+    # Written to a temporary file and renamed, so readers never see a partial table
+    rules = solver.space.rules
+    values = array('h', solver.values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, rules.fingers, rules.hands, rules_flags(rules),
+                                  solver.space.size))
+        values.tofile(f)
+    os.replace(temp_path, path)
+
+
+def load_table(path, space):
+    # Maps a saved table read-only; returns None if it is missing or was built
+    # by another version or rule set
+    rules = space.rules
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    expected = (TABLE_MAGIC, TABLE_VERSION, rules.fingers, rules.hands, rules_flags(rules), space.size)
+    if (len(mapped) != TABLE_HEADER.size + 2 * space.size
+            or TABLE_HEADER.unpack_from(mapped) != expected):
+        mapped.close()
+        return None
+    if sys.byteorder != 'little':
+        values = array('h', mapped[TABLE_HEADER.size:])
+        values.byteswap()
+        mapped.close()
+        return Solver(space, values)
+    # Probes index straight into the shared page cache without copying
+    return Solver(space, memoryview(mapped)[TABLE_HEADER.size:].cast('h'))
+
+
+@lru_cache(maxsize=None)
+def get_solver(rules=DEFAULT_RULES):
+    space = get_space(rules)
+    path = table_path(rules)
+    solver = load_table(path, space)
+    if solver is None:
+        solver = Solver(space)
+        try:
+            save_table(solver, path)
+        except OSError:
+            pass  # Read-only install: keep the in-memory table
+    return solver
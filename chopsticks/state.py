@@ -0,0 +1,106 @@
+# state.py
+# A position is packed into one small int, seen from the player to move:
+#   state = my_hands_index * num_hands + their_hands_index
+# where a hands index numbers the sorted tuple of one player's finger counts
+# (which hand holds which count never changes the game). Whose turn it is is
+# implied by the packing. Successor states are already flipped, so they are
+# read from the next player to move's point of view.
+from array import array
+from functools import lru_cache
+from itertools import combinations_with_replacement
+from rules import DEFAULT_RULES
+
+# Move flags
+SPLIT = 1  # Unset for attacks
+KNOCKOUT = 2  # Attack that kills an opponent's hand
+REVIVE = 4  # Split that brings a dead hand back
+
+
+class StateSpace:
+    def __init__(self, rules):
+        self.rules = rules
+        self.hands = list(combinations_with_replacement(range(rules.fingers), rules.hands))
+        self.hand_index = {hands: i for i, hands in enumerate(self.hands)}
+        self.num_hands = len(self.hands)
+        self.size = self.num_hands ** 2
+        # Successors of state s are successors[first[s]:first[s + 1]], knockouts first,
+        # with a parallel flags entry for each move
+        self.first = array('i')
+        self.successors = array('i')
+        self.flags = array('B')
+        self._build()
+
+    def encode(self, mine, theirs):
+        return self.hand_index[tuple(sorted(mine))] * self.num_hands + self.hand_index[tuple(sorted(theirs))]
+
+    def decode(self, state):
+        mine, theirs = divmod(state, self.num_hands)
+        return self.hands[mine], self.hands[theirs]
+
+    def is_lost(self, state):
+        # The player to move has no fingers left (all-zero hands are index 0)
+        return state < self.num_hands
+
+    def moves(self, state):
+        return range(self.first[state], self.first[state + 1])
+
+    def _split_targets(self):
+        rules = self.rules
+        if not rules.transfers:
+            return [[] for _ in self.hands]
+        by_total = {}
+        for hands in self.hands:
+            by_total.setdefault(sum(hands), []).append(hands)
+        targets = []
+        for hands in self.hands:
+            zeros = hands.count(0)
+            targets.append([self.hand_index[target] for target in by_total[sum(hands)]
+                            if target != hands and (rules.suicide_splits or target.count(0) <= zeros)])
+        return targets
+
+    def _build(self):
+        rules, hand_index, num_hands = self.rules, self.hand_index, self.num_hands
+        split_targets = self._split_targets()
+        first, successors, flags = self.first, self.successors, self.flags
+        for mine_index, mine in enumerate(self.hands):
+            attackers = {value for value in mine if value > 0}
+            zeros = mine.count(0)
+            for theirs_index, theirs in enumerate(self.hands):
+                first.append(len(successors))
+                knockouts, attacks, seen = [], [], set()
+                for position, value in enumerate(theirs):
+                    if value == 0 or (position > 0 and theirs[position - 1] == value):
+                        continue
+                    for attack_value in attackers:
+                        new_value = rules.attack(value, attack_value)
+                        attacked = theirs[:position] + (new_value,) + theirs[position + 1:]
+                        child = hand_index[tuple(sorted(attacked))] * num_hands + mine_index
+                        if child not in seen:
+                            seen.add(child)
+                            (knockouts if new_value == 0 else attacks).append(child)
+                successors.extend(knockouts)
+                flags.extend([KNOCKOUT] * len(knockouts))
+                successors.extend(attacks)
+                flags.extend([0] * len(attacks))
+                for target in split_targets[mine_index]:
+                    successors.append(theirs_index * num_hands + target)
+                    flags.append(SPLIT | REVIVE if self.hands[target].count(0) < zeros else SPLIT)
+        first.append(len(successors))
+
+
+@lru_cache(maxsize=None)
+def get_space(rules=DEFAULT_RULES):
+    return StateSpace(rules)
+
+
+def realign(current, values):
+    # Lays a sorted tuple of finger counts back onto a player's hands, leaving
+    # every hand whose count is still present where it was
+    remaining = list(values)
+    result = [None] * len(current)
+    for position, value in enumerate(current):
+        if value in remaining:
+            remaining.remove(value)
+            result[position] = value
+    fill = iter(remaining)
+    return [value if value is not None else next(fill) for value in result]
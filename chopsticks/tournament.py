@@ -0,0 +1,131 @@
+# tournament.py
+# Headless self-play between computer difficulties, spread over a process pool.
+# Example: python tournament.py -n 100000 -d e m h --workers 8 --seed 1
+import argparse
+import itertools
+import random
+import time
+from multiprocessing import Pool, cpu_count
+from computer import ComputerPlayer
+from game import Game
+from profiling import Profiler, write_profile
+from rules import DEFAULT_RULES, add_rules_arguments, rules_from_args
+from solver import get_solver
+
+DIFFICULTIES = ['e', 'm', 'h', 's']
+
+
+def play_chunk(job):
+    # Plays one chunk of games for a pairing. The RNG is seeded from the chunk,
+    # not the worker, so results don't depend on how chunks land on workers.
+    difficulty1, difficulty2, games, seed, rules, max_moves, repetitions, node_budget, profile = job
+    rng = random.Random(seed)
+    # Searchers run on a node budget only so their play is reproducible
+    player1 = ComputerPlayer("Computer 1", difficulty1, rules, time_budget=None, node_budget=node_budget,
+                             rng=rng, verbose=False)
+    player2 = ComputerPlayer("Computer 2", difficulty2, rules, time_budget=None, node_budget=node_budget,
+                             rng=rng, verbose=False)
+    wins1 = wins2 = draws = total_moves = 0
+    profiler = Profiler() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+    for _ in range(games):
+        player1.reset_hands()
+        player2.reset_hands()
+        game = Game(player1, player2, verbose=False, max_moves=max_moves, repetitions=repetitions)
+        result = game.play()
+        total_moves += result.moves
+        if result.is_draw():
+            draws += 1
+        elif result.winner is player1:
+            wins1 += 1
+        else:
+            wins2 += 1
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+    return (difficulty1, difficulty2, wins1, wins2, draws, total_moves, elapsed,
+            profiler.to_dict() if profiler is not None else None)
+
+
+def make_jobs(difficulties, games, chunk_size, seed, rules, max_moves, repetitions, node_budget, profile=False):
+    jobs = []
+    for difficulty1, difficulty2 in itertools.product(difficulties, repeat=2):
+        for chunk_index, start in enumerate(range(0, games, chunk_size)):
+            chunk_seed = f"{seed}-{difficulty1}{difficulty2}-{chunk_index}"
+            jobs.append((difficulty1, difficulty2, min(chunk_size, games - start), chunk_seed,
+                         rules, max_moves, repetitions, node_budget, profile))
+    return jobs
+
+
+def run_tournament(difficulties, games, workers=None, chunk_size=1000, seed=0, rules=DEFAULT_RULES,
+                   max_moves=200, repetitions=3, node_budget=2000, profiler=None):
+    # Returns {(difficulty1, difficulty2): totals} with per-pairing counts and timings.
+    # Given a Profiler, every worker profiles its games and the results are merged into it.
+    jobs = make_jobs(difficulties, games, chunk_size, seed, rules, max_moves, repetitions, node_budget,
+                     profiler is not None)
+    if 'h' in difficulties:
+        get_solver(rules)  # Build the on-disk table once; workers map it read-only
+    results = {pair: {'games': 0, 'wins1': 0, 'wins2': 0, 'draws': 0, 'moves': 0, 'cpu_time': 0.0}
+               for pair in itertools.product(difficulties, repeat=2)}
+    with Pool(workers or cpu_count()) as pool:
+        for difficulty1, difficulty2, wins1, wins2, draws, moves, elapsed, profile in \
+                pool.imap_unordered(play_chunk, jobs):
+            totals = results[(difficulty1, difficulty2)]
+            totals['games'] += wins1 + wins2 + draws
+            totals['wins1'] += wins1
+            totals['wins2'] += wins2
+            totals['draws'] += draws
+            totals['moves'] += moves
+            totals['cpu_time'] += elapsed
+            if profile is not None:
+                profiler.merge(profile)
+    return results
+
+
+def print_results(results, wall_time):
+    print(f"{'pairing':<8} {'games':>9} {'p1 win':>7} {'p2 win':>7} {'draw':>7} {'avg len':>8} {'moves/s':>10}")
+    total_moves = 0
+    for (difficulty1, difficulty2), totals in results.items():
+        games = totals['games']
+        if not games:
+            continue
+        total_moves += totals['moves']
+        moves_per_second = totals['moves'] / totals['cpu_time'] if totals['cpu_time'] else 0.0
+        print(f"{difficulty1 + ' v ' + difficulty2:<8} {games:>9} "
+              f"{totals['wins1'] / games:>7.1%} {totals['wins2'] / games:>7.1%} "
+              f"{totals['draws'] / games:>7.1%} {totals['moves'] / games:>8.1f} {moves_per_second:>10.0f}")
+    print(f"\n{total_moves} moves in {wall_time:.2f} s ({total_moves / wall_time:.0f} moves/s across all workers)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless chopsticks self-play tournament")
+    parser.add_argument('-n', '--games', type=int, default=1000, help="games per pairing")
+    parser.add_argument('-d', '--difficulties', nargs='+', default=['e', 'm', 'h'], choices=DIFFICULTIES)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="games per job sent to a worker")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-moves', type=int, default=200, help="moves before a game is drawn")
+    parser.add_argument('--repetitions', type=int, default=3, help="repeats of a position that draw the game")
+    parser.add_argument('--nodes', type=int, default=2000, help="node budget per move for 's'")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="record engine counters and timings to PATH (JSON, or pstats data if it ends in .prof)")
+    add_rules_arguments(parser)
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error(f"--games must be at least 1, got {args.games}")
+    rules = rules_from_args(args, parser)
+
+    profiler = Profiler() if args.profile else None
+    start = time.perf_counter()
+    results = run_tournament(args.difficulties, args.games, args.workers, args.chunk_size, args.seed,
+                             rules, args.max_moves, args.repetitions, args.nodes, profiler)
+    print_results(results, time.perf_counter() - start)
+    if profiler is not None:
+        write_profile(profiler, args.profile)
+        print(f"Wrote profile to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+""" Availability
+Answers repeated questions about free time against one fixed set of ignore rules:
+is a moment free, when is the next free slot of a given length, and how much
+free time lies between two moments.
+
+An Availability is built once from a Schedule. Because the recurring rules
+repeat every week, free time up to any moment is a whole number of weeks'
+worth plus a prefix of one week. The index keeps running totals within the week
+and over the one-off exclusions, so most queries are a couple of bisects. Full
+lists of valid ranges for a period are memoized in an LRU cache.
+
+Example:
+    availability = Availability(schedule)
+    availability.is_valid("2024-12-23 10:30")
+    availability.next_slot("2024-12-23 10:30", timedelta(hours=2))
+    availability.available_minutes("2024-12-01 00:00", "2025-01-01 00:00")
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import lru_cache
+
+from schedule import SECONDS_PER_WEEK, WEEK_ORIGIN, Schedule
+from valid_ranges import TIMESTAMP_FORMAT, from_seconds, to_seconds
+
+# Far enough ahead to stand in for "no end" when searching for a slot
+FOREVER = to_seconds(datetime(9999, 12, 31))
+
+
+def _to_seconds(timestamp):
+    """
+    Converts a 'YYYY-MM-DD HH:MM' string or a naive datetime to seconds (see to_seconds).
+
+    Args:
+        timestamp: The timestamp.
+
+    Returns:
+        The number of seconds as an int.
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    return to_seconds(timestamp)
+
+
+class Availability:
+    """
+    A query index over a fixed set of ignore rules.
+
+    Changes made to the schedule after the Availability is built are not seen; build a new one.
+    """
+
+    def __init__(self, schedule, cache_size=1024):
+        """
+        Builds the index.
+
+        Args:
+            schedule: The Schedule holding the ignore rules.
+            cache_size: How many periods' valid range lists to keep in the LRU cache.
+        """
+        weekly, one_offs = schedule.normalized_windows()
+        self._schedule = Schedule.from_windows(weekly, one_offs)  # Private copy for range sweeps
+
+        # Weekly windows, with blocked time before each one
+        self._weekly_starts = [start for start, _ in weekly]
+        self._weekly_ends = [end for _, end in weekly]
+        self._weekly_blocked = [0]
+        for start, end in weekly:
+            self._weekly_blocked.append(self._weekly_blocked[-1] + end - start)
+        self._week_free = SECONDS_PER_WEEK - self._weekly_blocked[-1]
+
+        # One-off windows, with the free weekly time each removes and running totals of it
+        self._one_off_starts = [start for start, _ in one_offs]
+        self._one_off_ends = [end for _, end in one_offs]
+        self._one_off_removed = [0]
+        for start, end in one_offs:
+            self._one_off_removed.append(self._one_off_removed[-1] + self._weekly_free(start, end))
+
+        # Longest free stretch the weekly rules allow, wrapping from one week into the next
+        if weekly:
+            gaps = [start - previous_end for previous_end, start in
+                    zip(self._weekly_ends, self._weekly_starts[1:])]
+            gaps.append(self._weekly_starts[0] + SECONDS_PER_WEEK - self._weekly_ends[-1])
+            self._longest_free = max(gaps)
+        else:
+            self._longest_free = None  # No limit
+
+        self._cached_ranges = lru_cache(maxsize=cache_size)(self._valid_ranges)
+
+    @classmethod
+    def from_ignore_range(cls, ignore_range, cache_size=1024):
+        """
+        Builds an index for a single daily ignore range, as used by get_valid_ranges.
+
+        Args:
+            ignore_range: A list of two 'HH:MM' strings (e.g., ['01:00', '06:00']). Equal start and end
+                          ignore nothing (see Schedule.from_ignore_range).
+            cache_size: As for the constructor.
+
+        Returns:
+            The new Availability.
+        """
+        return cls(Schedule.from_ignore_range(ignore_range), cache_size)
+
+    def _free_before(self, seconds):
+        """
+        Returns the free time allowed by the weekly rules from the origin up to a moment.
+
+        Args:
+            seconds: A time in seconds (see to_seconds).
+
+        Returns:
+            Free seconds; only differences between two calls are meaningful.
+        """
+        week, offset = divmod(seconds - WEEK_ORIGIN, SECONDS_PER_WEEK)
+        index = bisect_right(self._weekly_ends, offset)
+        blocked = self._weekly_blocked[index]
+        if index < len(self._weekly_starts) and self._weekly_starts[index] < offset:
+            blocked += offset - self._weekly_starts[index]  # Partway through a window
+        return week * self._week_free + offset - blocked
+
+    def _weekly_free(self, start, end):
+        """
+        Returns the free time between two moments allowing for the weekly rules only.
+
+        Args:
+            start: A time in seconds (see to_seconds).
+            end: A later time in seconds.
+
+        Returns:
+            Free seconds.
+        """
+        return self._free_before(end) - self._free_before(start)
+
+    def available_seconds(self, start, end):
+        """
+        Returns the total free time between two moments.
+
+        Args:
+            start: A 'YYYY-MM-DD HH:MM' string or naive datetime.
+            end: A later moment in the same form.
+
+        Returns:
+            Free seconds between start and end, 0 if end is not after start.
+        """
+        start, end = _to_seconds(start), _to_seconds(end)
+        if end <= start:
+            return 0
+        free = self._weekly_free(start, end)
+        # One-off windows overlapping [start, end), less the parts sticking out at either side
+        first = bisect_right(self._one_off_ends, start)
+        last = bisect_left(self._one_off_starts, end)
+        if first < last:
+            free -= self._one_off_removed[last] - self._one_off_removed[first]
+            if self._one_off_starts[first] < start:
+                free += self._weekly_free(self._one_off_starts[first], start)
+            if self._one_off_ends[last - 1] > end:
+                free += self._weekly_free(end, self._one_off_ends[last - 1])
+        return free
+
+    def available_minutes(self, start, end):
+        """
+        Returns the total free time between two moments, in minutes.
+
+        Args:
+            start: A 'YYYY-MM-DD HH:MM' string or naive datetime.
+            end: A later moment in the same form.
+
+        Returns:
+            Free minutes as a float.
+        """
+        return self.available_seconds(start, end) / 60
+
+    def is_valid(self, timestamp):
+        """
+        Checks whether a moment lies outside every ignore window.
+
+        Args:
+            timestamp: A 'YYYY-MM-DD HH:MM' string or naive datetime.
+
+        Returns:
+            True if the moment is free. Windows include their start and exclude their end.
+        """
+        seconds = _to_seconds(timestamp)
+        offset = (seconds - WEEK_ORIGIN) % SECONDS_PER_WEEK
+        index = bisect_right(self._weekly_ends, offset)
+        if index < len(self._weekly_starts) and self._weekly_starts[index] <= offset:
+            return False
+        index = bisect_right(self._one_off_ends, seconds)
+        return not (index < len(self._one_off_starts) and self._one_off_starts[index] <= seconds)
+
+    def next_slot(self, after, duration):
+        """
+        Finds the earliest free stretch at least as long as duration, from a given moment on.
+
+        Args:
+            after: A 'YYYY-MM-DD HH:MM' string or naive datetime.
+            duration: A timedelta.
+
+        Returns:
+            A tuple (start_datetime, end_datetime) of the whole free stretch, which starts no earlier
+            than after (the slot itself is its first duration), or None if no stretch is ever long enough.
+        """
+        needed = duration.total_seconds()
+        if self._longest_free is not None and needed > self._longest_free:
+            return None  # One-off windows can only shorten the weekly stretches
+        for start, end in self._schedule.iter_valid_seconds(_to_seconds(after), FOREVER):
+            if end - start >= needed:
+                return from_seconds(start), from_seconds(end)
+        return None
+
+    def _valid_ranges(self, period_start, period_end):
+        """
+        Computes the valid ranges of a period for the LRU cache.
+
+        Args:
+            period_start: A 'YYYY-MM-DD HH:MM' string.
+            period_end: A 'YYYY-MM-DD HH:MM' string.
+
+        Returns:
+            A tuple of (start_timestamp, end_timestamp) string pairs.
+        """
+        return tuple(self._schedule.get_valid_ranges([period_start, period_end]))
+
+    def valid_ranges(self, period):
+        """
+        Returns the valid ranges of a period, memoized for repeated queries.
+
+        Args:
+            period: A list of two 'YYYY-MM-DD HH:MM' strings, the start and end of the period.
+
+        Returns:
+            A tuple of (start_timestamp, end_timestamp) string pairs, as Schedule.get_valid_ranges.
+        """
+        period_start, period_end = period
+        return self._cached_ranges(period_start, period_end)
+
+    def cache_info(self):
+        """
+        Returns hit and miss statistics for the valid range cache.
+
+        Returns:
+            The functools.lru_cache CacheInfo named tuple.
+        """
+        return self._cached_ranges.cache_info()
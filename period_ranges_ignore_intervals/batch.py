@@ -0,0 +1,161 @@
+""" Batch Valid Ranges
+Vectorized version of get_valid_ranges for many periods at once.
+
+Each row is a period with its own daily ignore range. The per-row arithmetic is
+the same as RangeLayout in valid_ranges.py (one free stretch per day, with only
+the first and last clipped to the period), done with NumPy array operations over
+every row at once. Results come back as columns instead of lists of strings.
+
+Example:
+    starts = np.array(['2024-01-01T10:00', '2024-03-01T00:00'], dtype='datetime64[m]')
+    ends = np.array(['2024-01-02T23:00', '2024-03-08T00:00'], dtype='datetime64[m]')
+    result = get_valid_ranges_batch(starts, ends, '02:00', '05:00')
+    # result.row, result.start and result.end are parallel arrays, one entry per valid range
+
+With pandas, pass columns as arrays, e.g. df['start'].to_numpy().
+"""
+
+from collections import namedtuple
+from datetime import time
+
+import numpy as np
+
+from valid_ranges import SECONDS_PER_DAY, time_to_seconds
+
+# Columnar result: row holds the index of the input period each range belongs to,
+# start and end are datetime64[s] arrays. Ranges are ordered by row, then by time.
+BatchRanges = namedtuple("BatchRanges", ["row", "start", "end"])
+
+
+def _to_epoch_seconds(timestamps):
+    """
+    Converts datetime64 values (or anything NumPy can read as datetime64) to int64 epoch seconds.
+
+    Args:
+        timestamps: A datetime64 array, or a scalar or sequence NumPy can convert.
+
+    Returns:
+        An int64 array of seconds since 1970-01-01 00:00.
+    """
+    return np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def _to_day_seconds(times_of_day):
+    """
+    Converts times of day to int64 seconds after midnight.
+
+    Args:
+        times_of_day: An 'HH:MM' string, a datetime.time, or a timedelta64 array or scalar
+                      measured from midnight.
+
+    Returns:
+        An int64 array (0-d for a scalar) of seconds after midnight.
+    """
+    if isinstance(times_of_day, str):
+        times_of_day = time.fromisoformat(times_of_day)
+    if isinstance(times_of_day, time):
+        return np.int64(time_to_seconds(times_of_day))
+    return np.asarray(times_of_day, dtype="timedelta64[s]").astype(np.int64) % SECONDS_PER_DAY
+
+
+def _layouts(period_starts, period_ends, ignore_starts, ignore_ends):
+    """
+    Lays out the valid ranges of every period, as RangeLayout does for one.
+
+    Args:
+        period_starts: Period starts, as for get_valid_ranges_batch.
+        period_ends: Period ends, as for get_valid_ranges_batch.
+        ignore_starts: Ignore range starts, as for get_valid_ranges_batch.
+        ignore_ends: Ignore range ends, as for get_valid_ranges_batch.
+
+    Returns:
+        A tuple (start, end, first_free_start, free_length, count) of int64 arrays with one entry
+        per period; all but count are in epoch seconds or seconds.
+    """
+    start = _to_epoch_seconds(period_starts)
+    end = _to_epoch_seconds(period_ends)
+    ignore_start = _to_day_seconds(ignore_starts)
+    ignore_end = _to_day_seconds(ignore_ends)
+    start, end, ignore_start, ignore_end = np.broadcast_arrays(start, end, ignore_start, ignore_end)
+
+    # Epoch seconds are whole days away from midnight, so the day arithmetic carries over unchanged
+    free_length = SECONDS_PER_DAY - (ignore_end - ignore_start) % SECONDS_PER_DAY
+    first_day = (start - ignore_end - free_length) // SECONDS_PER_DAY + 1
+    last_day = (end - ignore_end - 1) // SECONDS_PER_DAY
+    first_free_start = first_day * SECONDS_PER_DAY + ignore_end
+    count = np.where(start < end, np.maximum(last_day - first_day + 1, 0), 0)
+    return start, end, first_free_start, free_length, count
+
+
+def count_valid_ranges_batch(period_starts, period_ends, ignore_starts, ignore_ends):
+    """
+    Counts the valid ranges of every period without building them.
+
+    Args:
+        period_starts: Period starts, as for get_valid_ranges_batch.
+        period_ends: Period ends, as for get_valid_ranges_batch.
+        ignore_starts: Ignore range starts, as for get_valid_ranges_batch.
+        ignore_ends: Ignore range ends, as for get_valid_ranges_batch.
+
+    Returns:
+        An int64 array with the number of valid ranges for each period.
+    """
+    return _layouts(period_starts, period_ends, ignore_starts, ignore_ends)[4]
+
+
+def total_valid_seconds_batch(period_starts, period_ends, ignore_starts, ignore_ends):
+    """
+    Returns the total valid time of every period without building its ranges.
+
+    Args:
+        period_starts: Period starts, as for get_valid_ranges_batch.
+        period_ends: Period ends, as for get_valid_ranges_batch.
+        ignore_starts: Ignore range starts, as for get_valid_ranges_batch.
+        ignore_ends: Ignore range ends, as for get_valid_ranges_batch.
+
+    Returns:
+        An int64 array with the summed length of each period's valid ranges, in seconds.
+    """
+    start, end, first_free_start, free_length, count = _layouts(
+        period_starts, period_ends, ignore_starts, ignore_ends
+    )
+    # Every stretch at full length, minus whatever the period cuts off the first and last ones
+    last_free_start = first_free_start + (count - 1) * SECONDS_PER_DAY
+    clipped = np.maximum(start - first_free_start, 0) + np.maximum(last_free_start + free_length - end, 0)
+    return np.where(count > 0, count * free_length - clipped, 0)
+
+
+def get_valid_ranges_batch(period_starts, period_ends, ignore_starts, ignore_ends):
+    """
+    Calculates the valid ranges of many periods at once, each excluding its own daily ignore range.
+
+    All four arguments broadcast against each other, so a single ignore range can be shared by
+    every period. Nothing loops over periods or days in Python: the cost is a handful of array
+    operations over the periods and then over the output ranges.
+
+    Args:
+        period_starts: Period starts as a datetime64 array (any unit; finer units are truncated to whole seconds).
+        period_ends: Period ends as a datetime64 array.
+        ignore_starts: Daily ignore range starts, as timedelta64 from midnight, or one 'HH:MM'
+                       string or datetime.time for every period.
+        ignore_ends: Daily ignore range ends, in the same forms. An end earlier than the start
+                     means the range runs overnight.
+
+    Returns:
+        A BatchRanges tuple of parallel arrays: row (int64 index of the period), start and end
+        (datetime64[s]). For each row the ranges match get_valid_ranges for that period.
+    """
+    start, end, first_free_start, free_length, count = _layouts(
+        period_starts, period_ends, ignore_starts, ignore_ends
+    )
+    start, end, first_free_start, free_length, count = (
+        np.ravel(a) for a in (start, end, first_free_start, free_length, count)
+    )
+    row = np.repeat(np.arange(count.size, dtype=np.int64), count)
+    # Position of each output range within its row: 0, 1, ..., count - 1
+    offsets = np.cumsum(count) - count
+    index = np.arange(row.size, dtype=np.int64) - offsets[row]
+    free_start = first_free_start[row] + index * SECONDS_PER_DAY
+    range_start = np.maximum(start[row], free_start)
+    range_end = np.minimum(end[row], free_start + free_length[row])
+    return BatchRanges(row, range_start.astype("datetime64[s]"), range_end.astype("datetime64[s]"))
@@ -5,116 +5,12 @@ automatically excluding a specific time range that repeats every day
 avoid certain hours each day.
 """
 
-from datetime import datetime, timedelta, time
+from datetime import datetime
+from itertools import islice
 
-def get_valid_ranges(period, ignore_range):
-    """
-    Calculates valid timestamp ranges within a given period, excluding a recurring daily ignore range.
-
-    Args:
-        period: A list of two strings representing the start and end timestamps of the period
-                (e.g., ['2024-08-12 09:00', '2024-08-15 17:00']).
-        ignore_range: A list of two strings representing the start and end times of the daily ignore range
-                      (e.g., ['01:00', '06:00']).  This range is assumed to be less than 24 hours.
-
-    Returns:
-        A list of tuples, where each tuple is a valid timestamp range (start_timestamp, end_timestamp)
-        as strings formatted as 'YYYY-MM-DD HH:MM'. These ranges are within the given period and outside
-        the daily ignore range, and are designed to be sequential and exhaustively cover the valid time
-        within the period.
-    """
-    # Extract start and end strings for period and ignore range
-    period_start_str, period_end_str = period
-    ignore_start_time_str, ignore_end_time_str = ignore_range
-
-    # Convert period strings to datetime objects
-    period_start = datetime.strptime(period_start_str, "%Y-%m-%d %H:%M")
-    period_end = datetime.strptime(period_end_str, "%Y-%m-%d %H:%M")
-    # Convert ignore range time strings to time objects
-    ignore_start_time = time.fromisoformat(ignore_start_time_str)
-    ignore_end_time = time.fromisoformat(ignore_end_time_str)
-
-    valid_ranges = []  # Initialize an empty list to store valid time ranges
-    current_time = period_start  # Start processing from the beginning of the period
-
-    while (
-        current_time < period_end
-    ):  # Iterate as long as the current time is before the period end
-        current_date = (
-            current_time.date()
-        )  # Get the date of the current time for daily ignore range calculation
-        ignore_start_datetime = datetime.combine(
-            current_date, ignore_start_time
-        )  # Combine date with ignore start time
-        ignore_end_datetime = datetime.combine(
-            current_date, ignore_end_time
-        )  # Combine date with ignore end time
-
-        if current_time < ignore_start_datetime:
-            # Case 1: Current time is before the daily ignore period starts.
-            # Valid range extends from current time up to the start of the ignore period (or period end).
-            valid_end_time = min(
-                ignore_start_datetime, period_end
-            )  # End of valid range is either ignore start or period end
-            if (
-                current_time < valid_end_time
-            ):  # Ensure start is before end to have a valid range
-                valid_ranges.append(
-                    (
-                        current_time.strftime("%Y-%m-%d %H:%M"),
-                        valid_end_time.strftime("%Y-%m-%d %H:%M"),
-                    )
-                )
-                current_time = (
-                    valid_end_time  # Move current time to the end of the valid range
-                )
-            else:
-                current_time = ignore_start_datetime  # If no valid range, move to ignore start to avoid infinite loop
-
-        elif ignore_start_datetime <= current_time < ignore_end_datetime:
-            # Case 2: Current time is within the daily ignore period.
-            # Skip the ignore period by setting current time to the end of the ignore period.
-            current_time = ignore_end_datetime
-
-        elif ignore_end_datetime <= current_time:
-            # Case 3: Current time is after the daily ignore period ends.
-            # Valid range extends from current time up to the next day's ignore start or period end.
-            valid_end_time = period_end  # Initially assume valid until period end
-            next_day_date = current_date + timedelta(
-                days=1
-            )  # Calculate next day's date
-            next_day_ignore_start_datetime = datetime.combine(
-                next_day_date, ignore_start_time
-            )  # Next day's ignore start
-
-            # Determine the valid end time: either period end or next day's ignore start (whichever is earlier and within period)
-            if (
-                current_time < next_day_ignore_start_datetime
-                and next_day_ignore_start_datetime <= period_end
-            ):
-                valid_end_time = next_day_ignore_start_datetime  # End at next day's ignore start if it's within the period
-            # else if current_time >= next_day_ignore_start_datetime, or next_day_ignore_start_datetime > period_end,
-            # then valid_end_time remains period_end (or potentially already set to period_end initially).
-
-            if (
-                current_time < valid_end_time
-            ):  # Ensure start is before end for a valid range
-                valid_ranges.append(
-                    (
-                        current_time.strftime("%Y-%m-%d %H:%M"),
-                        valid_end_time.strftime("%Y-%m-%d %H:%M"),
-                    )
-                )
-                current_time = (
-                    valid_end_time  # Move current time to the end of the valid range
-                )
-            else:
-                current_time = valid_end_time  # If no valid range, move to valid_end_time to avoid infinite loop
-
-        else:
-            break  # Safety break to prevent infinite loop in unexpected scenarios
-
-    return valid_ranges  # Return the list of valid time ranges
+from schedule import Schedule
+from timezones import iter_valid_ranges_tz
+from valid_ranges import format_timestamp, get_valid_ranges, iter_valid_ranges
 
 
 def print_valid_ranges_formatted(valid_ranges):
@@ -122,25 +18,28 @@ def print_valid_ranges_formatted(valid_ranges):
     Prints the valid timestamp ranges in a user-friendly format.
 
     Args:
-        valid_ranges: A list of tuples, where each tuple is a valid timestamp range
-                      (start_timestamp, end_timestamp) as strings.
+        valid_ranges: An iterable of tuples, where each tuple is a valid timestamp range
+                      (start_timestamp, end_timestamp) as strings or datetimes. Generators such as
+                      iter_valid_ranges' are printed as they are consumed, without building a list.
     """
-    if not valid_ranges:
-        print(
-            "No valid ranges found within the given period and outside the ignore range."
-        )
-        return
-
-    print("Valid Time Ranges:")
+    found = False
     for index, time_range in enumerate(
         valid_ranges, 1
     ):  # Enumerate to number the ranges starting from 1
+        if found:  # Add a separator between ranges
+            print("-" * 15)  # Separator line for better readability
+        else:
+            print("Valid Time Ranges:")
+            found = True
         start_time, end_time = time_range
         print(f"Range {index}:")
-        print(f"  Start: {start_time}")
-        print(f"  End:   {end_time}")
-        if index < len(valid_ranges):  # Add a separator if it's not the last range
-            print("-" * 15)  # Separator line for better readability
+        print(f"  Start: {format_timestamp(start_time)}")
+        print(f"  End:   {format_timestamp(end_time)}")
+
+    if not found:
+        print(
+            "No valid ranges found within the given period and outside the ignore range."
+        )
 
 
 
@@ -165,6 +64,33 @@ print(f"Period: {period}")
 print(f"Ignore Range: {ignore_range}")
 print_valid_ranges_formatted(get_valid_ranges(period, ignore_range))
 
+print("\n#################  Test Case 4: Next free slots, streamed  #################")
+period = ["2024-01-01 00:00", "2034-01-01 00:00"]
+ignore_range = ["22:00", "06:00"]
+after = datetime(2024, 6, 1, 23, 30)
+print(f"Period: {period}")
+print(f"Ignore Range: {ignore_range}")
+print(f"First 3 ranges after {after:%Y-%m-%d %H:%M}")
+print_valid_ranges_formatted(islice(iter_valid_ranges(period, ignore_range, after), 3))
+
+print("\n#################  Test Case 5: Schedule with several rules  #################")
+period = ["2024-12-20 09:00", "2024-12-27 17:00"]
+schedule = Schedule()
+schedule.add_daily("22:00", "06:00")  # Every night
+schedule.add_daily("12:00", "13:00", weekdays=range(5))  # Lunch, Monday to Friday
+schedule.add_daily("00:00", "00:00", weekdays=[5, 6])  # All of Saturday and Sunday
+schedule.add_one_off("2024-12-25 00:00", "2024-12-26 00:00")  # Holiday
+print(f"Period: {period}")
+print("Ignore: nights 22:00-06:00, weekday lunches 12:00-13:00, weekends, 2024-12-25")
+print_valid_ranges_formatted(schedule.iter_valid_ranges(period))
+
+print("\n#################  Test Case 6: Daylight saving change (America/New_York)  #################")
+period = ["2024-03-09 12:00", "2024-03-11 12:00"]
+ignore_range = ["01:00", "04:00"]
+print(f"Period: {period}")
+print(f"Ignore Range: {ignore_range}")
+print_valid_ranges_formatted(iter_valid_ranges_tz(period, ignore_range, "America/New_York"))
+
 # # Define the ignore range for all test cases
 # common_ignore_range = ["01:00", "06:00"]
 
@@ -0,0 +1,271 @@
+""" Schedules
+Ignore rules beyond a single daily range: several windows per day, windows that
+run overnight, windows that only apply on some weekdays, and one-off exclusions
+such as holidays.
+
+Recurring windows repeat every week, so they are normalized once into a sorted,
+merged list of intervals within a week (seconds from Monday 00:00). One-off
+exclusions are kept as a separate sorted, merged list. A query finds its place
+in both lists with bisect and sweeps forward through them together, so its cost
+grows with the number of ranges it returns, not with days times rules.
+
+Example:
+    schedule = Schedule()
+    schedule.add_daily("22:00", "06:00")  # Every night
+    schedule.add_daily("12:00", "13:00", weekdays=range(5))  # Lunch, Monday to Friday
+    schedule.add_daily("00:00", "00:00", weekdays=[5, 6])  # All of Saturday and Sunday
+    schedule.add_one_off("2024-12-25 00:00", "2024-12-26 00:00")
+    schedule.get_valid_ranges(["2024-12-20 09:00", "2024-12-31 17:00"])
+"""
+
+from bisect import bisect_right
+from datetime import datetime, time
+from heapq import merge
+from itertools import islice
+
+from valid_ranges import (
+    SECONDS_PER_DAY,
+    TIMESTAMP_FORMAT,
+    format_seconds,
+    from_seconds,
+    time_to_seconds,
+    to_seconds,
+)
+
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+# to_seconds counts from 0001-01-01 00:00, a Monday, which sits one day in
+WEEK_ORIGIN = SECONDS_PER_DAY
+
+
+def merge_intervals(intervals):
+    """
+    Sorts intervals and merges any that overlap or touch.
+
+    Args:
+        intervals: An iterable of (start, end) pairs with start < end.
+
+    Returns:
+        A sorted list of disjoint (start, end) pairs covering the same time.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class Schedule:
+    """
+    A set of recurring and one-off ignore rules, indexed for fast valid range queries.
+
+    Rules can be added at any time; the index is rebuilt on the next query after a change.
+    """
+
+    def __init__(self):
+        """
+        Creates a schedule with no ignore rules.
+        """
+        self._weekly_rules = []  # (start, end) in seconds from Monday 00:00, end may pass the week's end
+        self._one_off_rules = []  # (start, end) in seconds (see to_seconds)
+        self._weekly = None  # Merged index, built lazily
+        self._weekly_ends = None
+        self._one_offs = None
+        self._one_off_ends = None
+
+    @classmethod
+    def from_ignore_range(cls, ignore_range):
+        """
+        Creates a schedule with a single daily ignore range, as used by get_valid_ranges.
+
+        Args:
+            ignore_range: A list of two 'HH:MM' strings (e.g., ['01:00', '06:00']). As in get_valid_ranges,
+                          equal start and end ignore nothing (unlike add_daily, where they ignore the whole
+                          day). get_valid_ranges still splits its ranges at that time each day, whereas the
+                          schedule returns the free time as one range.
+
+        Returns:
+            The new Schedule.
+        """
+        schedule = cls()
+        start, end = ignore_range
+        if time.fromisoformat(start) != time.fromisoformat(end):
+            schedule.add_daily(start, end)
+        return schedule
+
+    @classmethod
+    def from_windows(cls, weekly, one_offs):
+        """
+        Creates a schedule from ignore windows already in seconds, such as normalized_windows' output.
+
+        Args:
+            weekly: Recurring (start, end) windows in seconds from Monday 00:00.
+            one_offs: One-off (start, end) windows in seconds (see to_seconds).
+
+        Returns:
+            The new Schedule.
+        """
+        schedule = cls()
+        schedule._weekly_rules = list(weekly)
+        schedule._one_off_rules = list(one_offs)
+        return schedule
+
+    def add_daily(self, start, end, weekdays=None):
+        """
+        Adds an ignore window that repeats every day, or on some weekdays.
+
+        Args:
+            start: Window start as an 'HH:MM' string or a time object.
+            end: Window end in the same form. If it is not after start the window runs overnight
+                 into the next day; equal start and end ignore the whole day.
+            weekdays: Optional iterable of the weekdays the window starts on, 0 for Monday to 6 for
+                      Sunday (as datetime.weekday()). Defaults to every day.
+        """
+        start_seconds = time_to_seconds(time.fromisoformat(start) if isinstance(start, str) else start)
+        end_seconds = time_to_seconds(time.fromisoformat(end) if isinstance(end, str) else end)
+        length = (end_seconds - start_seconds) % SECONDS_PER_DAY or SECONDS_PER_DAY
+        for weekday in range(7) if weekdays is None else weekdays:
+            if not 0 <= weekday < 7:
+                raise ValueError(f"Weekday must be between 0 and 6, got {weekday}")
+            window_start = weekday * SECONDS_PER_DAY + start_seconds
+            self._weekly_rules.append((window_start, window_start + length))
+        self._weekly = None
+
+    def add_one_off(self, start, end):
+        """
+        Adds a single ignore window, such as a holiday.
+
+        Args:
+            start: Window start as a 'YYYY-MM-DD HH:MM' string or a naive datetime.
+            end: Window end in the same form.
+        """
+        start_seconds = to_seconds(datetime.strptime(start, TIMESTAMP_FORMAT) if isinstance(start, str) else start)
+        end_seconds = to_seconds(datetime.strptime(end, TIMESTAMP_FORMAT) if isinstance(end, str) else end)
+        if start_seconds < end_seconds:
+            self._one_off_rules.append((start_seconds, end_seconds))
+            self._one_offs = None
+
+    def _build_index(self):
+        """
+        Normalizes the rules into the merged weekly and one-off interval lists.
+        """
+        if self._weekly is None:
+            # Windows running past the end of the week wrap round to its start
+            pieces = []
+            for start, end in self._weekly_rules:
+                if end > SECONDS_PER_WEEK:
+                    pieces.append((start, SECONDS_PER_WEEK))
+                    pieces.append((0, end - SECONDS_PER_WEEK))
+                else:
+                    pieces.append((start, end))
+            self._weekly = merge_intervals(pieces)
+            self._weekly_ends = [end for _, end in self._weekly]
+        if self._one_offs is None:
+            self._one_offs = merge_intervals(self._one_off_rules)
+            self._one_off_ends = [end for _, end in self._one_offs]
+
+    def normalized_windows(self):
+        """
+        Returns the merged ignore windows the schedule answers queries from.
+
+        Returns:
+            A tuple (weekly, one_offs) of sorted lists of disjoint (start, end) pairs. Weekly windows
+            are in seconds from Monday 00:00 and lie within one week; one-off windows are in seconds
+            (see to_seconds).
+        """
+        self._build_index()
+        return list(self._weekly), list(self._one_offs)
+
+    def _weekly_from(self, start):
+        """
+        Yields the recurring ignore windows in time order, from the first one ending after start.
+
+        Args:
+            start: A time in seconds (see to_seconds).
+
+        Yields:
+            (start, end) pairs in seconds; the generator never ends if there are any weekly rules.
+        """
+        if not self._weekly:
+            return
+        week, offset = divmod(start - WEEK_ORIGIN, SECONDS_PER_WEEK)
+        week_start = WEEK_ORIGIN + week * SECONDS_PER_WEEK
+        index = bisect_right(self._weekly_ends, offset)
+        while True:
+            for window_start, window_end in self._weekly[index:]:
+                yield week_start + window_start, week_start + window_end
+            week_start += SECONDS_PER_WEEK
+            index = 0
+
+    def _blocked_from(self, start):
+        """
+        Merges the recurring and one-off ignore windows into one stream, from start onwards.
+
+        Args:
+            start: A time in seconds (see to_seconds).
+
+        Returns:
+            An iterator of (start, end) pairs in seconds, in order of start and possibly overlapping.
+        """
+        self._build_index()
+        one_offs = islice(self._one_offs, bisect_right(self._one_off_ends, start), None)
+        return merge(self._weekly_from(start), one_offs)
+
+    def iter_valid_seconds(self, start, end):
+        """
+        Yields the valid ranges between two times given in seconds.
+
+        Args:
+            start: Period start in seconds (see to_seconds).
+            end: Period end in seconds.
+
+        Yields:
+            Maximal (start, end) pairs of valid time, in seconds and in order.
+        """
+        cursor = start
+        for blocked_start, blocked_end in self._blocked_from(start):
+            if blocked_start >= end:
+                break
+            if blocked_start > cursor:
+                yield cursor, blocked_start
+            if blocked_end > cursor:
+                cursor = blocked_end
+        if cursor < end:
+            yield cursor, end
+
+    def iter_valid_ranges(self, period):
+        """
+        Yields the valid ranges of a period lazily, as datetime pairs.
+
+        Args:
+            period: A list of two 'YYYY-MM-DD HH:MM' strings, the start and end of the period.
+
+        Yields:
+            Tuples (start_datetime, end_datetime), in order.
+        """
+        period_start_str, period_end_str = period
+        start = to_seconds(datetime.strptime(period_start_str, TIMESTAMP_FORMAT))
+        end = to_seconds(datetime.strptime(period_end_str, TIMESTAMP_FORMAT))
+        for range_start, range_end in self.iter_valid_seconds(start, end):
+            yield from_seconds(range_start), from_seconds(range_end)
+
+    def get_valid_ranges(self, period):
+        """
+        Calculates the valid ranges of a period outside every ignore rule.
+
+        Args:
+            period: A list of two 'YYYY-MM-DD HH:MM' strings, the start and end of the period.
+
+        Returns:
+            A list of tuples (start_timestamp, end_timestamp) of 'YYYY-MM-DD HH:MM' strings, as
+            get_valid_ranges returns. Adjacent or overlapping rules never split a range.
+        """
+        period_start_str, period_end_str = period
+        start = to_seconds(datetime.strptime(period_start_str, TIMESTAMP_FORMAT))
+        end = to_seconds(datetime.strptime(period_end_str, TIMESTAMP_FORMAT))
+        return [
+            (format_seconds(range_start), format_seconds(range_end))
+            for range_start, range_end in self.iter_valid_seconds(start, end)
+        ]
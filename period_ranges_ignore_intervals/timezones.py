@@ -0,0 +1,209 @@
+""" Time Zones
+Valid ranges for periods and ignore ranges given in local wall-clock time, with
+daylight saving handled correctly.
+
+Working per day with zoneinfo conversions would be slow, so instead the period
+is worked in UTC epoch seconds. A table of the zone's UTC offset transitions is
+built once per zone and span of years. Between two transitions the offset is
+constant, so the daily ignore range is just a fixed daily range in UTC, shifted
+by the offset, and the arithmetic in valid_ranges.RangeLayout applies as is.
+Ranges that meet where one offset segment ends and the next begins are joined.
+
+An ignore range covers every moment whose local time of day falls inside it. On
+a spring-forward day the skipped hour simply isn't there; on a fall-back day a
+repeated hour inside the range is ignored both times.
+
+Example:
+    get_valid_ranges_tz(["2024-03-09 12:00", "2024-03-11 12:00"], ["01:00", "04:00"], "America/New_York")
+"""
+
+from bisect import bisect_right
+from datetime import datetime, time, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from valid_ranges import SECONDS_PER_DAY, TIMESTAMP_FORMAT, RangeLayout, time_to_seconds
+
+
+def _utc_offset(tz, epoch_seconds):
+    """
+    Returns a zone's UTC offset at a moment.
+
+    Args:
+        tz: A tzinfo object such as a ZoneInfo.
+        epoch_seconds: The moment, in seconds since 1970-01-01 00:00 UTC.
+
+    Returns:
+        The offset in seconds (local time minus UTC).
+    """
+    return int(datetime.fromtimestamp(epoch_seconds, tz).utcoffset().total_seconds())
+
+
+@lru_cache(maxsize=None)
+def offset_table(tz, first_year, last_year):
+    """
+    Builds the table of UTC offset transitions for a zone over a span of years.
+
+    The zone is sampled once a day, and each change of offset is then pinned down to the
+    second by bisection, so this costs one conversion per day of the span plus a few per
+    transition. Tables are cached, so bulk work in one zone pays for this once.
+
+    Args:
+        tz: A tzinfo object such as a ZoneInfo.
+        first_year: First calendar year the table must cover.
+        last_year: Last calendar year the table must cover.
+
+    Returns:
+        A tuple (transitions, offsets) of lists: offsets[i] is the UTC offset in seconds from
+        epoch second transitions[i] until transitions[i + 1]. The first entry starts a day
+        before first_year and the last runs to the end of last_year.
+    """
+    start = int(datetime(first_year, 1, 1, tzinfo=timezone.utc).timestamp()) - SECONDS_PER_DAY
+    end = int(datetime(last_year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) + SECONDS_PER_DAY
+    transitions = [start]
+    offsets = [_utc_offset(tz, start)]
+    sample = start
+    while sample < end:
+        next_sample = sample + SECONDS_PER_DAY
+        offset = _utc_offset(tz, next_sample)
+        if offset != offsets[-1]:
+            # The change happened somewhere in (sample, next_sample]
+            low, high = sample, next_sample
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _utc_offset(tz, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            transitions.append(high)
+            offsets.append(offset)
+        sample = next_sample
+    return transitions, offsets
+
+
+def _to_epoch(timestamp, tz):
+    """
+    Converts a local 'YYYY-MM-DD HH:MM' string or a datetime to UTC epoch seconds.
+
+    Args:
+        timestamp: A string or naive datetime in the zone's wall-clock time, or an aware datetime.
+                   Wall-clock times that are skipped or repeated resolve as zoneinfo does with fold=0.
+        tz: A tzinfo object such as a ZoneInfo.
+
+    Returns:
+        The number of seconds since 1970-01-01 00:00 UTC, as an int.
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=tz)
+    return int(timestamp.timestamp())
+
+
+def iter_valid_epoch_ranges(start, end, ignore_range, tz):
+    """
+    Yields the valid ranges between two moments, excluding a daily ignore range in local time.
+
+    Args:
+        start: Period start, in UTC epoch seconds.
+        end: Period end, in UTC epoch seconds.
+        ignore_range: A list of two 'HH:MM' strings (e.g., ['01:00', '06:00']) in the zone's wall-clock
+                      time. An end earlier than the start means the range runs overnight.
+        tz: A tzinfo object such as a ZoneInfo, or a zone name such as 'Europe/London'.
+
+    Yields:
+        Maximal (start, end) pairs of UTC epoch seconds, in order.
+    """
+    if isinstance(tz, str):
+        tz = ZoneInfo(tz)
+    if start >= end:
+        return
+    ignore_start = time_to_seconds(time.fromisoformat(ignore_range[0]))
+    ignore_end = time_to_seconds(time.fromisoformat(ignore_range[1]))
+    transitions, offsets = offset_table(
+        tz,
+        datetime.fromtimestamp(start, timezone.utc).year,
+        datetime.fromtimestamp(end, timezone.utc).year,
+    )
+
+    pending = None  # Last range found, held back in case the next segment continues it
+    index = bisect_right(transitions, start) - 1
+    segment_start = start
+    while segment_start < end:
+        segment_end = min(end, transitions[index + 1]) if index + 1 < len(transitions) else end
+        offset = offsets[index]
+        # In UTC the local ignore range starts and ends offset seconds earlier
+        layout = RangeLayout(
+            segment_start,
+            segment_end,
+            (ignore_start - offset) % SECONDS_PER_DAY,
+            (ignore_end - offset) % SECONDS_PER_DAY,
+        )
+        for range_index in range(layout.count):
+            range_start, range_end = layout.range_at(range_index)
+            if pending is not None and pending[1] == range_start:
+                pending = (pending[0], range_end)
+            else:
+                if pending is not None:
+                    yield pending
+                pending = (range_start, range_end)
+        segment_start = segment_end
+        index += 1
+    if pending is not None:
+        yield pending
+
+
+def get_valid_epoch_ranges(period, ignore_range, tz):
+    """
+    Calculates valid ranges in a time zone as UTC epoch seconds, for bulk work.
+
+    Args:
+        period: A list of two timestamps, the start and end of the period, as local 'YYYY-MM-DD HH:MM'
+                strings or datetimes (see iter_valid_ranges_tz).
+        ignore_range: A list of two 'HH:MM' strings in the zone's wall-clock time.
+        tz: A tzinfo object such as a ZoneInfo, or a zone name such as 'Europe/London'.
+
+    Returns:
+        A list of (start, end) pairs of UTC epoch seconds.
+    """
+    if isinstance(tz, str):
+        tz = ZoneInfo(tz)
+    period_start, period_end = period
+    return list(iter_valid_epoch_ranges(_to_epoch(period_start, tz), _to_epoch(period_end, tz), ignore_range, tz))
+
+
+def iter_valid_ranges_tz(period, ignore_range, tz):
+    """
+    Yields the valid ranges of a period in a time zone, as aware datetimes.
+
+    Args:
+        period: A list of two timestamps, the start and end of the period. Each is a 'YYYY-MM-DD HH:MM'
+                string or naive datetime in the zone's wall-clock time, or an aware datetime.
+        ignore_range: A list of two 'HH:MM' strings (e.g., ['01:00', '06:00']) in the zone's wall-clock time.
+        tz: A tzinfo object such as a ZoneInfo, or a zone name such as 'Europe/London'.
+
+    Yields:
+        Tuples (start_datetime, end_datetime) of datetimes aware in tz, in order.
+    """
+    if isinstance(tz, str):
+        tz = ZoneInfo(tz)
+    period_start, period_end = period
+    for start, end in iter_valid_epoch_ranges(_to_epoch(period_start, tz), _to_epoch(period_end, tz),
+                                              ignore_range, tz):
+        yield datetime.fromtimestamp(start, tz), datetime.fromtimestamp(end, tz)
+
+
+def get_valid_ranges_tz(period, ignore_range, tz):
+    """
+    Calculates valid ranges in a time zone, excluding a daily ignore range in local wall-clock time.
+
+    Args:
+        period: A list of two timestamps, as for iter_valid_ranges_tz.
+        ignore_range: A list of two 'HH:MM' strings in the zone's wall-clock time.
+        tz: A tzinfo object such as a ZoneInfo, or a zone name such as 'Europe/London'.
+
+    Returns:
+        A list of tuples (start_datetime, end_datetime) of datetimes aware in tz. Away from daylight
+        saving changes these match get_valid_ranges for the same local period.
+    """
+    return list(iter_valid_ranges_tz(period, ignore_range, tz))
@@ -0,0 +1,351 @@
+""" Valid Range Arithmetic
+Computes the valid ranges of a period directly instead of walking it day by day.
+
+Once the daily ignore range is fixed, the valid time is a regular pattern: one
+free stretch of the same length every day, starting where the ignore range
+ends. Only the first and last of these stretches can be cut short by the
+period itself, so the number of valid ranges, the k-th range and the total
+valid duration all follow from a little integer arithmetic in seconds.
+"""
+
+import csv
+import json
+from datetime import date, datetime, timedelta, time
+from itertools import islice
+
+SECONDS_PER_DAY = 24 * 60 * 60
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+# " HH:MM" for every minute of the day, indexed by minute
+CLOCK_STRINGS = [f" {minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+
+
+def to_seconds(timestamp):
+    """
+    Converts a naive datetime to whole seconds counted from 0001-01-01 00:00.
+
+    Args:
+        timestamp: A naive datetime object.
+
+    Returns:
+        The number of seconds as an int. Microseconds are dropped.
+    """
+    return (
+        timestamp.toordinal() * SECONDS_PER_DAY
+        + timestamp.hour * 3600
+        + timestamp.minute * 60
+        + timestamp.second
+    )
+
+
+def from_seconds(seconds):
+    """
+    Converts seconds counted from 0001-01-01 00:00 back to a naive datetime.
+
+    Args:
+        seconds: An int as returned by to_seconds.
+
+    Returns:
+        The matching datetime object.
+    """
+    day, second_of_day = divmod(seconds, SECONDS_PER_DAY)
+    return datetime.combine(date.fromordinal(day), time()) + timedelta(seconds=second_of_day)
+
+
+def format_seconds(seconds):
+    """
+    Formats seconds counted from 0001-01-01 00:00 as a 'YYYY-MM-DD HH:MM' string.
+
+    This joins the date's isoformat with a precomputed clock string instead of going
+    through strftime, which matters when formatting many ranges.
+
+    Args:
+        seconds: An int as returned by to_seconds.
+
+    Returns:
+        The timestamp string.
+    """
+    day, second_of_day = divmod(seconds, SECONDS_PER_DAY)
+    return date.fromordinal(day).isoformat() + CLOCK_STRINGS[second_of_day // 60]
+
+
+def format_timestamp(timestamp):
+    """
+    Formats a timestamp as a 'YYYY-MM-DD HH:MM' string, passing strings through unchanged.
+
+    Args:
+        timestamp: A datetime object or an already formatted string.
+
+    Returns:
+        The timestamp string.
+    """
+    if isinstance(timestamp, datetime):
+        return timestamp.strftime(TIMESTAMP_FORMAT)
+    return timestamp
+
+
+def time_to_seconds(t):
+    """
+    Converts a time of day to seconds after midnight.
+
+    Args:
+        t: A time object.
+
+    Returns:
+        The number of seconds after midnight as an int.
+    """
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+class RangeLayout:
+    """
+    The valid ranges of one period, described without listing them.
+
+    Valid range i (counting from 0) is the free stretch starting at
+    first_free_start + i days, which lasts free_length seconds, clipped to the
+    period. Only range 0 and the last range can actually be clipped.
+
+    Attributes:
+        start: Period start, in seconds (see to_seconds).
+        end: Period end, in seconds.
+        ignore_start: Start of the daily ignore range, in seconds after midnight.
+        ignore_end: End of the daily ignore range, in seconds after midnight.
+        first_free_start: Unclipped start of the first valid range, in seconds.
+        free_length: Length of an unclipped valid range, in seconds.
+        count: The number of valid ranges.
+    """
+
+    def __init__(self, start, end, ignore_start, ignore_end):
+        """
+        Lays out the valid ranges of a period.
+
+        Args:
+            start: Period start, in seconds (see to_seconds).
+            end: Period end, in seconds.
+            ignore_start: Start of the daily ignore range, in seconds after midnight.
+            ignore_end: End of the daily ignore range, in seconds after midnight. If it is
+                        earlier than ignore_start the ignore range runs overnight. If the two
+                        are equal nothing is ignored, but ranges still break at that time each day.
+        """
+        self.start = start
+        self.end = end
+        self.ignore_start = ignore_start
+        self.ignore_end = ignore_end
+        # Each day's free stretch runs from the end of the ignore range to the next start of it
+        self.free_length = SECONDS_PER_DAY - (ignore_end - ignore_start) % SECONDS_PER_DAY
+        # First stretch that ends after the period starts, and last one that starts before it ends
+        first_day = (start - ignore_end - self.free_length) // SECONDS_PER_DAY + 1
+        last_day = (end - ignore_end - 1) // SECONDS_PER_DAY
+        self.first_free_start = first_day * SECONDS_PER_DAY + ignore_end
+        self.count = max(0, last_day - first_day + 1) if start < end else 0
+
+    def range_at(self, index):
+        """
+        Returns one valid range in seconds.
+
+        Args:
+            index: Position of the range, from 0 to count - 1. Negative indices count from the end.
+
+        Returns:
+            A tuple (start_seconds, end_seconds).
+
+        Raises:
+            IndexError: If there is no range at that position.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("valid range index out of range")
+        free_start = self.first_free_start + index * SECONDS_PER_DAY
+        return max(self.start, free_start), min(self.end, free_start + self.free_length)
+
+    def total_seconds(self):
+        """
+        Returns the total valid time in the period.
+
+        Returns:
+            The sum of the lengths of all valid ranges, in seconds.
+        """
+        if self.count == 0:
+            return 0
+        first_start, first_end = self.range_at(0)
+        if self.count == 1:
+            return first_end - first_start
+        last_start, last_end = self.range_at(self.count - 1)
+        # Every range between the first and last is a whole, unclipped stretch
+        return (first_end - first_start) + (last_end - last_start) + (self.count - 2) * self.free_length
+
+
+def get_layout(period, ignore_range):
+    """
+    Parses a period and a daily ignore range and lays out their valid ranges.
+
+    Args:
+        period: A list of two strings representing the start and end timestamps of the period
+                (e.g., ['2024-08-12 09:00', '2024-08-15 17:00']).
+        ignore_range: A list of two strings representing the start and end times of the daily ignore range
+                      (e.g., ['01:00', '06:00']).
+
+    Returns:
+        A RangeLayout for the period.
+    """
+    period_start_str, period_end_str = period
+    ignore_start_time_str, ignore_end_time_str = ignore_range
+    return RangeLayout(
+        to_seconds(datetime.strptime(period_start_str, TIMESTAMP_FORMAT)),
+        to_seconds(datetime.strptime(period_end_str, TIMESTAMP_FORMAT)),
+        time_to_seconds(time.fromisoformat(ignore_start_time_str)),
+        time_to_seconds(time.fromisoformat(ignore_end_time_str)),
+    )
+
+
+def get_valid_ranges(period, ignore_range):
+    """
+    Calculates valid timestamp ranges within a given period, excluding a recurring daily ignore range.
+
+    Args:
+        period: A list of two strings representing the start and end timestamps of the period
+                (e.g., ['2024-08-12 09:00', '2024-08-15 17:00']).
+        ignore_range: A list of two strings representing the start and end times of the daily ignore range
+                      (e.g., ['01:00', '06:00']). An end earlier than the start means the range runs
+                      overnight (e.g., ['22:00', '06:00']).
+
+    Returns:
+        A list of tuples, where each tuple is a valid timestamp range (start_timestamp, end_timestamp)
+        as strings formatted as 'YYYY-MM-DD HH:MM'. These ranges are within the given period and outside
+        the daily ignore range, and are designed to be sequential and exhaustively cover the valid time
+        within the period.
+    """
+    layout = get_layout(period, ignore_range)
+    valid_ranges = []
+    for index in range(layout.count):
+        start, end = layout.range_at(index)
+        valid_ranges.append((format_seconds(start), format_seconds(end)))
+    return valid_ranges
+
+
+def count_valid_ranges(period, ignore_range):
+    """
+    Counts the valid ranges get_valid_ranges would return, in constant time.
+
+    Args:
+        period: The period, as for get_valid_ranges.
+        ignore_range: The daily ignore range, as for get_valid_ranges.
+
+    Returns:
+        The number of valid ranges.
+    """
+    return get_layout(period, ignore_range).count
+
+
+def get_valid_range(period, ignore_range, index):
+    """
+    Returns a single valid range without building the others, in constant time.
+
+    Args:
+        period: The period, as for get_valid_ranges.
+        ignore_range: The daily ignore range, as for get_valid_ranges.
+        index: Position of the range in get_valid_ranges' list. Negative indices count from the end.
+
+    Returns:
+        A tuple (start_timestamp, end_timestamp) of 'YYYY-MM-DD HH:MM' strings.
+
+    Raises:
+        IndexError: If there is no valid range at that position.
+    """
+    start, end = get_layout(period, ignore_range).range_at(index)
+    return format_seconds(start), format_seconds(end)
+
+
+def total_valid_duration(period, ignore_range):
+    """
+    Returns the total valid time in a period, in constant time.
+
+    Args:
+        period: The period, as for get_valid_ranges.
+        ignore_range: The daily ignore range, as for get_valid_ranges.
+
+    Returns:
+        A timedelta holding the summed length of all valid ranges.
+    """
+    return timedelta(seconds=get_layout(period, ignore_range).total_seconds())
+
+
+def iter_valid_ranges(period, ignore_range, after=None):
+    """
+    Yields the valid ranges of a period one at a time, without building a list.
+
+    Memory use is constant however long the period is, and stopping early (e.g. with
+    itertools.islice) skips all the work for the ranges that are never asked for.
+
+    Args:
+        period: The period, as for get_valid_ranges.
+        ignore_range: The daily ignore range, as for get_valid_ranges.
+        after: An optional naive datetime. If given, only valid time from this moment on is
+               yielded, so a range that is already under way is cut to start at it.
+
+    Yields:
+        Tuples (start_datetime, end_datetime), in order.
+    """
+    layout = get_layout(period, ignore_range)
+    if after is not None and to_seconds(after) > layout.start:
+        # Lay the period out again from the later start; this is still constant time
+        layout = RangeLayout(to_seconds(after), layout.end, layout.ignore_start, layout.ignore_end)
+    for index in range(layout.count):
+        start, end = layout.range_at(index)
+        yield from_seconds(start), from_seconds(end)
+
+
+def next_free_slots(period, ignore_range, after, count):
+    """
+    Returns the next few valid ranges from a given moment.
+
+    Args:
+        period: The period, as for get_valid_ranges.
+        ignore_range: The daily ignore range, as for get_valid_ranges.
+        after: A naive datetime; valid time before it is skipped.
+        count: The most ranges to return.
+
+    Returns:
+        A list of up to count tuples (start_datetime, end_datetime).
+    """
+    return list(islice(iter_valid_ranges(period, ignore_range, after), count))
+
+
+def write_ranges_csv(valid_ranges, file):
+    """
+    Streams valid ranges to a CSV file, one 'start,end' row per range, with a header.
+
+    Args:
+        valid_ranges: An iterable of (start, end) pairs of datetimes or strings, such as
+                      iter_valid_ranges' output. It is consumed one range at a time.
+        file: A text file object to write to.
+
+    Returns:
+        The number of ranges written.
+    """
+    writer = csv.writer(file)
+    writer.writerow(["start", "end"])
+    written = 0
+    for start, end in valid_ranges:
+        writer.writerow([format_timestamp(start), format_timestamp(end)])
+        written += 1
+    return written
+
+
+def write_ranges_jsonl(valid_ranges, file):
+    """
+    Streams valid ranges as JSON lines, one {"start": ..., "end": ...} object per range.
+
+    Args:
+        valid_ranges: An iterable of (start, end) pairs of datetimes or strings, such as
+                      iter_valid_ranges' output. It is consumed one range at a time.
+        file: A text file object to write to.
+
+    Returns:
+        The number of ranges written.
+    """
+    written = 0
+    for start, end in valid_ranges:
+        file.write(json.dumps({"start": format_timestamp(start), "end": format_timestamp(end)}) + "\n")
+        written += 1
+    return written
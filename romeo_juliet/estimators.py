@@ -0,0 +1,237 @@
+"""Variance-reduced and quasi-Monte Carlo estimators of the meeting probability.
+
+All estimators share one API, estimate(method, samples, patience, seed), for
+uniform arrivals over the window, and report the estimator's variance and its
+effective sample size: the number of plain i.i.d. samples that would give the
+same variance.
+
+  iid         plain Monte Carlo, as simulation.simulate
+  antithetic  pairs (r, j) with (r, 60 - j); the two meeting bands overlap less
+              than chance, so the pair is negatively correlated
+  stratified  the 60 x 60 arrival square cut into one-minute cells, with the
+              same number of uniform points in each
+  sobol       scrambled 2D Sobol points (random linear scrambling plus digital
+              shift), with the variance taken over independent scramblings
+  halton      Halton points in bases 2 and 3 with random digit permutations,
+              with the variance taken over independent permutations
+
+Example: python estimators.py --target 1e-5
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from simulation import CHUNK_SIZE, WINDOW, count_meets, theoretical_probability
+
+METHODS = ['iid', 'antithetic', 'stratified', 'sobol', 'halton']
+REPLICATES = 16  # Independent randomisations used to estimate QMC variance
+BITS = 32
+
+EstimatorResult = namedtuple('EstimatorResult', ['method', 'proportion', 'variance', 'std_error', 'ess', 'samples'])
+
+
+def _result(method, proportion, variance, samples):
+    """Packs an estimate, deriving the standard error and effective sample size"""
+    proportion, variance = float(proportion), float(variance)
+    iid_variance = proportion * (1 - proportion)
+    ess = iid_variance / variance if variance > 0 else float('inf')
+    return EstimatorResult(method, proportion, variance, variance ** 0.5, ess, samples)
+
+
+def _meets(romeo, juliet, patience):
+    return np.abs(romeo - juliet) <= patience
+
+
+def estimate_iid(samples, patience, rng):
+    """Plain Monte Carlo with i.i.d. uniform arrivals"""
+    proportion = count_meets(samples, patience, rng) / samples
+    return _result('iid', proportion, proportion * (1 - proportion) / samples, samples)
+
+
+def estimate_antithetic(samples, patience, rng, chunk_size=CHUNK_SIZE):
+    """Antithetic pairs (r, j) and (r, 60 - j); samples counts both members of each pair"""
+    pairs = samples // 2
+    total = total_squares = 0.0
+    remaining = pairs
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        romeo, juliet = rng.uniform(0, WINDOW, size), rng.uniform(0, WINDOW, size)
+        pair_means = (_meets(romeo, juliet, patience).astype(float) + _meets(romeo, WINDOW - juliet, patience)) / 2
+        total += pair_means.sum()
+        total_squares += (pair_means ** 2).sum()
+        remaining -= size
+    proportion = total / pairs
+    pair_variance = (total_squares / pairs - proportion ** 2) * pairs / max(pairs - 1, 1)
+    return _result('antithetic', proportion, pair_variance / pairs, 2 * pairs)
+
+
+def estimate_stratified(samples, patience, rng, strata=WINDOW, chunk_size=CHUNK_SIZE):
+    """Equal allocation over a strata x strata grid of the arrival square"""
+    cells = strata * strata
+    per_cell = samples // cells
+    if per_cell < 2:
+        raise ValueError(f"stratified sampling needs at least {2 * cells} samples")
+    cell = np.arange(cells)
+    row, col = cell // strata, cell % strata
+    width = WINDOW / strata
+    sums = np.zeros(cells)
+    squares = np.zeros(cells)
+    remaining = per_cell
+    step = max(1, chunk_size // cells)
+    while remaining > 0:
+        size = min(step, remaining)
+        romeo = (row[:, None] + rng.random((cells, size))) * width
+        juliet = (col[:, None] + rng.random((cells, size))) * width
+        hits = _meets(romeo, juliet, patience).sum(axis=1)
+        sums += hits
+        squares += hits  # Indicators, so each square is the value itself
+        remaining -= size
+    means = sums / per_cell
+    cell_variances = (squares / per_cell - means ** 2) * per_cell / (per_cell - 1)
+    variance = cell_variances.sum() / (cells * cells * per_cell)
+    return _result('stratified', means.mean(), variance, cells * per_cell)
+
+
+def _sobol_directions():
+    """Returns the unscrambled 32-bit direction numbers of the first two Sobol dimensions"""
+    first = [1 << (BITS - 1 - k) for k in range(BITS)]  # Van der Corput in base 2
+    second = [1 << (BITS - 1)]
+    for _ in range(BITS - 1):  # Primitive polynomial x + 1
+        second.append(second[-1] ^ (second[-1] >> 1))
+    return [first, second]
+
+
+SOBOL_DIRECTIONS = _sobol_directions()
+
+
+def _scramble_directions(directions, rng):
+    """Applies a random lower-triangular binary matrix to each direction number (linear matrix scrambling)"""
+    # Row r gives output digit r: its own input digit plus a random mix of the more significant ones
+    rows = []
+    for r in range(BITS):
+        own = 1 << (BITS - 1 - r)
+        higher = int(rng.integers(0, 1 << r)) << (BITS - r) if r else 0
+        rows.append(own | higher)
+    scrambled = []
+    for v in directions:
+        out = 0
+        for r, mask in enumerate(rows):
+            if (mask & v).bit_count() & 1:
+                out |= 1 << (BITS - 1 - r)
+        scrambled.append(out)
+    return np.array(scrambled, dtype=np.uint64)
+
+
+def sobol_points(start, stop, directions, shifts):
+    """Returns scrambled Sobol points start..stop-1 as an (n, 2) array in [0, 1)"""
+    index = np.arange(start, stop, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    points = np.empty((len(index), len(directions)))
+    for dim, (vectors, shift) in enumerate(zip(directions, shifts)):
+        x = np.full(len(index), shift, dtype=np.uint64)
+        for bit in range(BITS):
+            x ^= np.where((gray >> np.uint64(bit)) & np.uint64(1) == 1, vectors[bit], np.uint64(0))
+        points[:, dim] = x / 2.0 ** BITS
+    return points
+
+
+def halton_points(start, stop, permutations):
+    """Returns Halton points start..stop-1 in bases 2 and 3, with per-digit permutations, as an (n, 2) array"""
+    index = np.arange(start, stop, dtype=np.int64)
+    points = np.empty((len(index), len(permutations)))
+    for dim, (base, digit_permutations) in enumerate(permutations):
+        remaining = index.copy()
+        x = np.zeros(len(index))
+        scale = 1.0
+        for permutation in digit_permutations:
+            scale /= base
+            x += permutation[remaining % base] * scale
+            remaining //= base
+        points[:, dim] = x
+    return points
+
+
+def _halton_permutations(rng):
+    """Draws a random permutation of the digits for every digit position of bases 2 and 3"""
+    permutations = []
+    for base in (2, 3):
+        digits = int(np.ceil(BITS / np.log2(base)))
+        permutations.append((base, [rng.permutation(base) for _ in range(digits)]))
+    return permutations
+
+
+def _estimate_qmc(method, samples, patience, rng, replicates, chunk_size):
+    """Averages independently randomised low-discrepancy point sets; variance comes from their spread"""
+    per_replicate = samples // replicates
+    means = []
+    for _ in range(replicates):
+        if method == 'sobol':
+            directions = [_scramble_directions(d, rng) for d in SOBOL_DIRECTIONS]
+            shifts = [np.uint64(rng.integers(0, 1 << BITS)) for _ in SOBOL_DIRECTIONS]
+        else:
+            permutations = _halton_permutations(rng)
+        hits = 0
+        for start in range(0, per_replicate, chunk_size):
+            stop = min(start + chunk_size, per_replicate)
+            if method == 'sobol':
+                points = sobol_points(start, stop, directions, shifts)
+            else:
+                points = halton_points(start, stop, permutations)
+            hits += int(np.count_nonzero(_meets(points[:, 0] * WINDOW, points[:, 1] * WINDOW, patience)))
+        means.append(hits / per_replicate)
+    means = np.array(means)
+    return _result(method, means.mean(), means.var(ddof=1) / replicates, per_replicate * replicates)
+
+
+def estimate(method, samples, patience, seed=None, replicates=REPLICATES, chunk_size=CHUNK_SIZE):
+    """Estimates the meeting probability with the chosen method; returns an EstimatorResult"""
+    rng = np.random.default_rng(seed)
+    if method == 'iid':
+        return estimate_iid(samples, patience, rng)
+    if method == 'antithetic':
+        return estimate_antithetic(samples, patience, rng, chunk_size)
+    if method == 'stratified':
+        return estimate_stratified(samples, patience, rng, chunk_size=chunk_size)
+    if method in ('sobol', 'halton'):
+        return _estimate_qmc(method, samples, patience, rng, replicates, chunk_size)
+    raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+
+
+def benchmark(target_error, patience=15, methods=METHODS, seed=0, max_samples=10**9):
+    """Doubles each method's sample count until its standard error reaches target_error
+
+    Returns (method, samples, seconds for the final run, result) rows.
+    """
+    rows = []
+    for method in methods:
+        samples = 2 ** 13
+        while True:
+            start = time.perf_counter()
+            result = estimate(method, samples, patience, seed)
+            elapsed = time.perf_counter() - start
+            if result.std_error <= target_error or samples * 2 > max_samples:
+                break
+            samples *= 2
+        rows.append((method, samples, elapsed, result))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare meeting probability estimators")
+    parser.add_argument('--target', type=float, default=1e-4, help="standard error to reach")
+    parser.add_argument('--patience', type=float, default=15)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--methods', nargs='+', default=METHODS, choices=METHODS)
+    args = parser.parse_args()
+
+    truth = float(theoretical_probability(args.patience))
+    print(f"{'method':<11} {'samples':>12} {'seconds':>8} {'estimate':>9} {'std err':>9} {'error':>10} {'ESS':>14}")
+    for method, samples, elapsed, result in benchmark(args.target, args.patience, args.methods, args.seed):
+        print(f"{method:<11} {samples:>12,} {elapsed:>8.3f} {result.proportion:>9.6f} {result.std_error:>9.2e} "
+              f"{result.proportion - truth:>+10.2e} {result.ess:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Multi-core, reproducible Monte Carlo runner with adaptive stopping.
+
+Samples are drawn in fixed-size chunks, and chunk i always uses the i-th stream
+spawned from one root SeedSequence. Chunks are merged in index order and the
+run stops at the first chunk where the confidence interval is narrow enough, so
+the result is bit-for-bit the same for any number of workers.
+
+Example: python runner.py --patience 15 --tolerance 1e-4 --seed 42 --workers 8
+"""
+import argparse
+import time
+from collections import deque, namedtuple
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from simulation import CHUNK_SIZE, UNIFORM, Estimate, confidence_interval, count_meets, theoretical_probability
+
+RunResult = namedtuple('RunResult', ['estimate', 'chunks', 'elapsed', 'workers', 'entropy'])
+
+
+def chunk_seed(entropy, index):
+    """Returns the seed stream for chunk `index`, the same as SeedSequence(entropy).spawn()'s index-th child"""
+    return np.random.SeedSequence(entropy, spawn_key=(index,))
+
+
+def run_chunk(job):
+    """Counts meetings in one chunk of samples"""
+    seed, samples, patience, romeo, juliet = job
+    return count_meets(samples, patience, np.random.default_rng(seed), romeo, juliet, samples)
+
+
+def run(patience, tolerance=1e-4, seed=None, workers=None, chunk_size=CHUNK_SIZE, max_samples=10**10,
+        confidence=0.95, romeo=UNIFORM, juliet=None):
+    """Simulates until the confidence interval half-width is at most tolerance, or max_samples is reached
+
+    Keeps twice as many chunks in flight as there are workers and merges counts as
+    each chunk completes, in chunk order. Returns a RunResult; its entropy reproduces
+    an unseeded run when passed back as seed.
+    """
+    workers = workers or cpu_count()
+    entropy = np.random.SeedSequence(seed).entropy
+    max_chunks = -(-max_samples // chunk_size)
+    meets = samples = chunks = 0
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        pending = deque()
+        next_chunk = 0
+        while True:
+            while len(pending) < 2 * workers and next_chunk < max_chunks:
+                size = min(chunk_size, max_samples - next_chunk * chunk_size)
+                job = (chunk_seed(entropy, next_chunk), size, patience, romeo, juliet)
+                pending.append((size, pool.apply_async(run_chunk, (job,))))
+                next_chunk += 1
+            if not pending:
+                break
+            size, result = pending.popleft()
+            meets += result.get()
+            samples += size
+            chunks += 1
+            low, high = confidence_interval(meets, samples, confidence)
+            if (high - low) / 2 <= tolerance:
+                break  # Chunks still in flight are discarded when the pool shuts down
+    elapsed = time.perf_counter() - start
+    low, high = confidence_interval(meets, samples, confidence)
+    return RunResult(Estimate(meets / samples, low, high, samples), chunks, elapsed, workers, entropy)
+
+
+def report(result, theoretical=None):
+    """Returns a printable summary of a run, compared with the theoretical probability if given"""
+    estimate = result.estimate
+    lines = [f"Estimate: {estimate.proportion:.6f} ({estimate.low:.6f} - {estimate.high:.6f}), "
+             f"half-width {(estimate.high - estimate.low) / 2:.2e}",
+             f"Samples: {estimate.samples:,} in {result.chunks} chunks, {result.elapsed:.2f} s on "
+             f"{result.workers} workers ({estimate.samples / result.elapsed / result.workers:,.0f} samples/s per core)",
+             f"Seed entropy: {result.entropy}"]
+    if theoretical is not None:
+        inside = estimate.low <= theoretical <= estimate.high
+        lines.append(f"Theoretical: {theoretical:.6f}, error {estimate.proportion - theoretical:+.2e} "
+                     f"({'inside' if inside else 'outside'} the interval)")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the Romeo and Juliet meeting probability")
+    parser.add_argument('--patience', type=float, default=15, help="minutes each waits (default: 15)")
+    parser.add_argument('--tolerance', type=float, default=1e-4, help="target confidence interval half-width")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="samples per job sent to a worker")
+    parser.add_argument('--max-samples', type=int, default=10**10)
+    args = parser.parse_args()
+
+    result = run(args.patience, args.tolerance, args.seed, args.workers, args.chunk_size, args.max_samples,
+                 args.confidence)
+    print(report(result, float(theoretical_probability(args.patience))))
+
+
+if __name__ == "__main__":
+    main()
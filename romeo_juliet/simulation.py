@@ -0,0 +1,126 @@
+"""Vectorized Monte Carlo engine for the Romeo and Juliet meeting problem.
+
+Romeo and Juliet each arrive at a random time between 8:00 and 9:00 and wait
+`patience` minutes for the other. Samples are drawn with a numpy Generator in
+fixed-size chunks, so memory stays bounded however many samples are asked for.
+"""
+from collections import namedtuple
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+
+WINDOW = 60  # Minutes in which both arrive
+CHUNK_SIZE = 1_000_000  # Samples drawn per chunk
+
+Estimate = namedtuple('Estimate', ['proportion', 'low', 'high', 'samples'])
+
+
+def _sample_uniform(low, high, rng, size):
+    return rng.uniform(low, high, size)
+
+
+def _sample_normal(mean, sd, low, high, rng, size):
+    return np.clip(rng.normal(mean, sd, size), low, high)
+
+
+# Samplers are partials of module-level functions so they can be sent to worker processes
+def uniform_arrivals(low=0, high=WINDOW):
+    """Returns a sampler of arrival times uniform between low and high"""
+    return partial(_sample_uniform, low, high)
+
+
+def normal_arrivals(mean=WINDOW / 2, sd=WINDOW / 4, low=0, high=WINDOW):
+    """Returns a sampler of normally distributed arrival times, clipped to [low, high]"""
+    return partial(_sample_normal, mean, sd, low, high)
+
+
+UNIFORM = uniform_arrivals()
+
+
+def theoretical_probability(patience, window=WINDOW):
+    """Returns the exact meeting probability for uniform arrivals; patience may be an array"""
+    waited = np.minimum(np.asarray(patience, dtype=float), window) / window
+    return 1 - (1 - waited) ** 2
+
+
+def count_meets(samples, patience, rng, romeo=UNIFORM, juliet=None, chunk_size=CHUNK_SIZE):
+    """Counts meetings in `samples` simulated evenings, drawing chunk_size at a time"""
+    juliet = juliet or romeo
+    meets = 0
+    remaining = samples
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        gaps = np.abs(romeo(rng, size) - juliet(rng, size))
+        meets += int(np.count_nonzero(gaps <= patience))
+        remaining -= size
+    return meets
+
+
+def sample_gaps(samples, rng, romeo=UNIFORM, juliet=None, chunk_size=CHUNK_SIZE):
+    """Returns the sorted gaps |romeo - juliet| of `samples` simulated evenings"""
+    juliet = juliet or romeo
+    gaps = np.empty(samples)
+    for start in range(0, samples, chunk_size):
+        size = min(chunk_size, samples - start)
+        np.abs(romeo(rng, size) - juliet(rng, size), out=gaps[start:start + size])
+    gaps.sort()
+    return gaps
+
+
+def sweep_patience(patiences, sims, seed=None, romeo=UNIFORM, juliet=None, chunk_size=CHUNK_SIZE):
+    """Returns the proportion of meets for every patience in `patiences`, from one set of simulated evenings
+
+    The gaps are drawn and sorted once, so each patience value costs one binary search.
+    With the same seed, each proportion matches simulate(sims, patience, seed).proportion.
+    """
+    gaps = sample_gaps(sims, np.random.default_rng(seed), romeo, juliet, chunk_size)
+    return np.searchsorted(gaps, np.asarray(patiences, dtype=float), side='right') / sims
+
+
+def meet_histograms(samples, patience, bins=WINDOW, seed=None, romeo=UNIFORM, juliet=None, chunk_size=CHUNK_SIZE):
+    """Bins simulated arrivals into bins x bins grids over the window, one for meets and one for misses
+
+    Returns (meet_counts, miss_counts, meets), with grids indexed [juliet bin, romeo bin] as
+    imshow expects. Arrivals outside the window are counted in the edge bins; meets is
+    counted from the samples themselves. Memory is two grids and one chunk, however many
+    samples are drawn.
+    """
+    rng = np.random.default_rng(seed)
+    juliet = juliet or romeo
+    meet_counts = np.zeros(bins * bins, dtype=np.int64)
+    all_counts = np.zeros(bins * bins, dtype=np.int64)
+    meets = 0
+    remaining = samples
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        romeo_times, juliet_times = romeo(rng, size), juliet(rng, size)
+        met = np.abs(romeo_times - juliet_times) <= patience
+        meets += int(np.count_nonzero(met))
+        # Times of exactly WINDOW go in the last bin, as with np.histogram2d
+        cells = (np.clip(np.floor(juliet_times * (bins / WINDOW)), 0, bins - 1).astype(np.int64) * bins
+                 + np.clip(np.floor(romeo_times * (bins / WINDOW)), 0, bins - 1).astype(np.int64))
+        all_counts += np.bincount(cells, minlength=bins * bins)
+        meet_counts += np.bincount(cells[met], minlength=bins * bins)
+        remaining -= size
+    return meet_counts.reshape(bins, bins), (all_counts - meet_counts).reshape(bins, bins), meets
+
+
+def confidence_interval(meets, samples, confidence=0.95):
+    """Returns the normal-approximation (low, high) interval for a proportion of meets"""
+    proportion = meets / samples
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * (proportion * (1 - proportion) / samples) ** 0.5
+    return max(0.0, proportion - half_width), min(1.0, proportion + half_width)
+
+
+def simulate(sims, patience, seed=None, romeo=UNIFORM, juliet=None, chunk_size=CHUNK_SIZE, confidence=0.95):
+    """Simulates Romeo and Juliet events and returns the proportion of meets with a confidence interval
+
+    seed may be an int, a numpy SeedSequence or an existing Generator. romeo and juliet
+    are samplers called as sampler(rng, size); juliet defaults to romeo's distribution.
+    """
+    rng = np.random.default_rng(seed)
+    meets = count_meets(sims, patience, rng, romeo, juliet, chunk_size)
+    low, high = confidence_interval(meets, sims, confidence)
+    return Estimate(meets / sims, low, high, sims)